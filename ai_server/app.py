@@ -1,16 +1,75 @@
+import time
+
+IMPORT_STARTED = time.perf_counter()
+
+import io
+import os
 import sys
+import hmac
 import json
+import struct
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 import numpy as np
-import torch
-import torch.nn as nn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
 
 sys.path.insert(0, str(Path(__file__).parent))
 
+from backends import EagerBackend, InferenceBackend, NumpyBackend, OnnxBackend, TorchScriptBackend, softmax
+from batching import MicroBatcher, QueueFullError
+from cache import PredictionCache
+from metrics import Metrics, MetricsMiddleware
+from registry import DEFAULT_VERSION, ModelRegistry
+
+# torch is imported by ModelManager only when a backend needs it, so the
+# NumPy and ONNX exports serve without loading it.
+if TYPE_CHECKING:
+    import torch
+
+STARTUP_TIMINGS: Dict[str, float] = {"imports_ms": round((time.perf_counter() - IMPORT_STARTED) * 1000, 2)}
+
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", 32))
+BATCH_WINDOW_MS = float(os.environ.get("BATCH_WINDOW_MS", 5))
+
+INFERENCE_EXECUTOR = os.environ.get("INFERENCE_EXECUTOR", "thread").lower()
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", 2))
+TORCH_NUM_THREADS = int(os.environ.get("TORCH_NUM_THREADS", max(1, (os.cpu_count() or 1) // INFERENCE_WORKERS)))
+MAX_QUEUE_DEPTH = int(os.environ.get("MAX_QUEUE_DEPTH", 512))
+
+MAX_REQUEST_BATCH = int(os.environ.get("MAX_REQUEST_BATCH", 256))
+STREAM_MAX_IN_FLIGHT = int(os.environ.get("STREAM_MAX_IN_FLIGHT", 64))
+
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", 4096))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", 60))
+PREDICTION_CACHE_BITS = int(os.environ.get("PREDICTION_CACHE_BITS", 6))
+
+MODEL_REGISTRY_DIR = Path(os.environ.get("MODEL_REGISTRY_DIR", Path(__file__).parent / "model" / "registry"))
+MODEL_VERSION = os.environ.get("MODEL_VERSION")
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+USE_QUANTIZED = os.environ.get("AI_QUANTIZED", "false").lower() == "true"
+QUANTIZED_MAX_ACCURACY_DROP = float(os.environ.get("QUANTIZED_MAX_ACCURACY_DROP", 1.0))
+
+AI_BACKEND = os.environ.get("AI_BACKEND", "eager").lower()
+
+AI_CASCADE = os.environ.get("AI_CASCADE", "false").lower() == "true"
+AI_CONFIDENCE_THRESHOLD = float(os.environ.get("AI_CONFIDENCE_THRESHOLD", 0.80))
+CASCADE_MARGIN = float(os.environ.get("CASCADE_MARGIN", 0.15))
+
+IMAGE_SIZE = (28, 28)
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Stream frames: uint32 frame id, uint8 top_k, float32 threshold, uint16
+# target length, then the UTF-8 target (empty for a plain prediction) and
+# the image bytes.
+STREAM_HEADER = struct.Struct(">IBfH")
+
 class PredictRequest(BaseModel):
     shape: List[int] = Field(..., description="Shape of the image array, e.g. [28, 28]")
     data: List[float] = Field(..., description="Flattened float array of pixel values [0,1]")
@@ -35,51 +94,58 @@ class PredictResponse(BaseModel):
     predictions: List[Prediction]
 
 
+class CompactPredictResponse(BaseModel):
+    labels: List[str]
+    confidences: List[float]
+
+
+class BatchPredictResponse(BaseModel):
+    results: List[CompactPredictResponse]
+
+
+class VerifyResponse(BaseModel):
+    target: str
+    confidence: float
+    passed: bool
+    labels: List[str] = []
+    confidences: List[float] = []
+
+
+class BatchVerifyResponse(BaseModel):
+    results: List[VerifyResponse]
+
+
 class HealthResponse(BaseModel):
     status: str
 
 
-class QuickDrawCNN(nn.Module):
-    def __init__(self, num_classes: int):
-        super().__init__()
-        
-        self.features = nn.Sequential(
-            nn.Conv2d(1, 32, kernel_size=3, padding=1),
-            nn.BatchNorm2d(32),
-            nn.ReLU(inplace=True),
-            nn.MaxPool2d(2, 2),
-            
-            nn.Conv2d(32, 64, kernel_size=3, padding=1),
-            nn.BatchNorm2d(64),
-            nn.ReLU(inplace=True),
-            nn.MaxPool2d(2, 2),
-            
-            nn.Conv2d(64, 128, kernel_size=3, padding=1),
-            nn.BatchNorm2d(128),
-            nn.ReLU(inplace=True),
-            nn.MaxPool2d(2, 2),
-        )
-        
-        self.classifier = nn.Sequential(
-            nn.Flatten(),
-            nn.Linear(128 * 3 * 3, 256),
-            nn.ReLU(inplace=True),
-            nn.Dropout(0.5),
-            nn.Linear(256, num_classes),
-        )
-    
-    def forward(self, x: torch.Tensor) -> torch.Tensor:
-        x = self.features(x)
-        x = self.classifier(x)
-        return x
+@contextmanager
+def timed(timings: Dict[str, float], phase: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[f"{phase}_ms"] = round((time.perf_counter() - started) * 1000, 2)
 
 
 class ModelManager:
     def __init__(self):
-        self.model: Optional[nn.Module] = None
+        self.model: Optional["torch.nn.Module"] = None
+        self.backend: Optional[InferenceBackend] = None
+        self.small_backend: Optional[InferenceBackend] = None
         self.labels: List[str] = []
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.label_indices: Dict[str, int] = {}
+        self.device: Optional["torch.device"] = None
         self.is_loaded = False
+        self.timings: Dict[str, float] = {}
+    
+    def _torch(self):
+        import torch
+        
+        if self.device is None:
+            torch.set_num_threads(TORCH_NUM_THREADS)
+            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        return torch
     
     def load(self, model_dir: Path):
         model_path = model_dir / "model.pt"
@@ -94,46 +160,386 @@ class ModelManager:
             print(f"Warning: Labels file not found at {labels_path}")
             return False
         
-        with open(labels_path, 'r') as f:
-            self.labels = json.load(f)
+        with timed(self.timings, "labels"):
+            with open(labels_path, 'r') as f:
+                self.labels = json.load(f)
+            self.label_indices = {label.lower(): idx for idx, label in enumerate(self.labels)}
         
-        checkpoint = torch.load(model_path, map_location=self.device, weights_only=False)
-        num_classes = checkpoint.get('num_classes', len(self.labels))
+        with timed(self.timings, "backend"):
+            self.backend = self._load_exported_backend(model_dir, model_path)
         
-        self.model = QuickDrawCNN(num_classes=num_classes)
-        self.model.load_state_dict(checkpoint['model_state_dict'])
-        self.model.to(self.device)
-        self.model.eval()
+        if self.backend is None:
+            if not (USE_QUANTIZED and self._load_quantized(model_dir / "model_int8.pt", model_path)):
+                self._load_fp32(model_dir, model_path)
+            self.backend = EagerBackend(self.model, self.device)
         
-        accuracy = checkpoint.get('accuracy', 'N/A')
-        print(f"Loaded model with {num_classes} classes (accuracy: {accuracy}%)")
-        print(f"Labels: {self.labels}")
-        print(f"Device: {self.device}")
+        if AI_CASCADE:
+            self._load_small(model_dir / "model_small.pt", model_path)
+        
+        print(f"Backend: {self.backend.name}" + (" (cascade)" if self.small_backend else ""))
         
         self.is_loaded = True
         return True
     
-    def predict(self, image: np.ndarray, top_k: int = 5) -> List[Prediction]:
+    def _load_fp32(self, model_dir: Path, model_path: Path) -> None:
+        from networks import QuickDrawCNN
+        
+        with timed(self.timings, "weights"):
+            state_dict, info, source = self._read_weights(model_dir, model_path)
+        
+        with timed(self.timings, "build"):
+            num_classes = info.get('num_classes') or len(self.labels)
+            
+            self.model = QuickDrawCNN(num_classes=num_classes)
+            self.model.load_state_dict(state_dict)
+            self.model.to(self.device)
+            self.model.eval()
+        
+        accuracy = info.get('accuracy', 'N/A')
+        print(f"Loaded model with {num_classes} classes from {source} (accuracy: {accuracy}%)")
+        print(f"Device: {self.device}")
+    
+    def _read_weights(self, model_dir: Path, model_path: Path) -> Tuple[dict, dict, str]:
+        torch = self._torch()
+        safetensors_path = model_dir / "model.safetensors"
+        
+        if safetensors_path.exists() and safetensors_path.stat().st_mtime >= model_path.stat().st_mtime:
+            try:
+                from safetensors import safe_open
+                
+                state_dict = {}
+                with safe_open(str(safetensors_path), framework="pt", device=str(self.device)) as f:
+                    metadata = f.metadata() or {}
+                    for key in f.keys():
+                        state_dict[key] = f.get_tensor(key)
+                
+                info = {
+                    'num_classes': int(metadata.get('num_classes', 0)) or None,
+                    'accuracy': metadata.get('accuracy', 'N/A'),
+                }
+                return state_dict, info, safetensors_path.name
+            
+            except ImportError:
+                print("Warning: safetensors not installed, reading model.pt")
+        
+        checkpoint = torch.load(model_path, map_location=self.device, weights_only=False)
+        return checkpoint['model_state_dict'], checkpoint, model_path.name
+    
+    def _load_exported_backend(self, model_dir: Path, model_path: Path) -> Optional[InferenceBackend]:
+        exported = {"torchscript": "model.ts", "onnx": "model.onnx", "numpy": "model.npz"}
+        
+        if AI_BACKEND == "eager":
+            return None
+        
+        if AI_BACKEND not in exported:
+            print(f"Warning: Unknown AI_BACKEND '{AI_BACKEND}', using eager")
+            return None
+        
+        exported_path = model_dir / exported[AI_BACKEND]
+        if not exported_path.exists():
+            print(f"Warning: {exported_path} not found, using eager")
+            print("Run: python training/export.py")
+            return None
+        
+        if exported_path.stat().st_mtime < model_path.stat().st_mtime:
+            print(f"Warning: {exported_path.name} is older than {model_path.name}, using eager")
+            return None
+        
+        try:
+            if AI_BACKEND == "onnx":
+                return OnnxBackend(exported_path, num_threads=TORCH_NUM_THREADS)
+            if AI_BACKEND == "numpy":
+                return NumpyBackend(exported_path)
+            self._torch()
+            return TorchScriptBackend(exported_path, self.device)
+        except ImportError as e:
+            print(f"Warning: {AI_BACKEND} backend unavailable ({e}), using eager")
+            return None
+    
+    def _load_quantized(self, quantized_path: Path, model_path: Path) -> bool:
+        from networks import QuickDrawCNN
+        
+        torch = self._torch()
+        if not quantized_path.exists():
+            print(f"Warning: Quantized model not found at {quantized_path}, using fp32")
+            print("Run: python training/quantize.py")
+            return False
+        
+        if quantized_path.stat().st_mtime < model_path.stat().st_mtime:
+            print(f"Warning: {quantized_path.name} is older than {model_path.name}, using fp32")
+            return False
+        
+        with timed(self.timings, "weights"):
+            checkpoint = torch.load(quantized_path, map_location="cpu", weights_only=False)
+        accuracy = checkpoint.get('accuracy')
+        fp32_accuracy = checkpoint.get('fp32_accuracy')
+        
+        if accuracy is None or fp32_accuracy is None:
+            print(f"Warning: {quantized_path.name} has no accuracy report, using fp32")
+            return False
+        
+        if fp32_accuracy - accuracy > QUANTIZED_MAX_ACCURACY_DROP:
+            print(f"Warning: Refusing {quantized_path.name}: accuracy {accuracy:.2f}% vs "
+                  f"{fp32_accuracy:.2f}% fp32 exceeds the {QUANTIZED_MAX_ACCURACY_DROP} point tolerance")
+            return False
+        
+        with timed(self.timings, "build"):
+            model = QuickDrawCNN(num_classes=checkpoint['num_classes'])
+            model.eval()
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            model.load_state_dict(checkpoint['model_state_dict'])
+        
+        self.model = model
+        self.device = torch.device("cpu")
+        
+        print(f"Loaded INT8 model with {checkpoint['num_classes']} classes "
+              f"(accuracy: {accuracy:.2f}%, fp32: {fp32_accuracy:.2f}%)")
+        print(f"Device: {self.device}")
+        return True
+    
+    def _load_small(self, small_path: Path, model_path: Path) -> None:
+        if not small_path.exists():
+            print(f"Warning: Small model not found at {small_path}, cascade disabled")
+            print("Run: python training/distill.py")
+            return
+        
+        if small_path.stat().st_mtime < model_path.stat().st_mtime:
+            print(f"Warning: {small_path.name} is older than {model_path.name}, cascade disabled")
+            return
+        
+        from networks import TinyQuickDrawCNN
+        
+        torch = self._torch()
+        checkpoint = torch.load(small_path, map_location=self.device, weights_only=False)
+        
+        model = TinyQuickDrawCNN(num_classes=checkpoint['num_classes'])
+        model.load_state_dict(checkpoint['model_state_dict'])
+        model.to(self.device)
+        model.eval()
+        self.small_backend = EagerBackend(model, self.device)
+        
+        print("Cascade: small model escalates when the target's (or top) confidence is within "
+              f"{CASCADE_MARGIN} of the threshold "
+              f"(escalated {checkpoint.get('escalation_rate', 0):.1f}% offline, "
+              f"win agreement {checkpoint.get('win_agreement', 0):.2f}%)")
+    
+    def small_probabilities(self, images: np.ndarray) -> np.ndarray:
+        return softmax(self.small_backend.run(np.ascontiguousarray(images, dtype=np.float32)))
+    
+    def probabilities(self, images: np.ndarray) -> np.ndarray:
         if not self.is_loaded:
             raise RuntimeError("Model not loaded")
         
-        tensor = torch.from_numpy(image).float().unsqueeze(0).unsqueeze(0)
-        tensor = tensor.to(self.device)
+        logits = self.backend.run(np.ascontiguousarray(images, dtype=np.float32))
+        return softmax(logits)
+    
+    def top_k_indices(self, probabilities: np.ndarray, top_k: int = 5) -> np.ndarray:
+        top_k = min(top_k, len(self.labels))
+        if top_k <= 0:
+            return np.empty(0, dtype=np.int64)
         
-        with torch.no_grad():
-            outputs = self.model(tensor)
-            probabilities = torch.softmax(outputs, dim=1)
+        candidates = np.argpartition(-probabilities, top_k - 1)[:top_k]
+        return candidates[np.argsort(-probabilities[candidates])]
+    
+    def target_index(self, target: str) -> Optional[int]:
+        return self.label_indices.get(target.lower())
+    
+    def top_k(self, probabilities: np.ndarray, top_k: int = 5) -> List[Prediction]:
+        return [
+            Prediction(label=self.labels[idx], confidence=float(probabilities[idx]))
+            for idx in self.top_k_indices(probabilities, top_k)
+        ]
+    
+    def predict(self, image: np.ndarray, top_k: int = 5) -> List[Prediction]:
+        return self.top_k(self.probabilities(image[np.newaxis])[0], top_k)
+    
+    def predict_batch(self, images: np.ndarray, top_k: int = 5) -> List[List[Prediction]]:
+        return [self.top_k(row, top_k) for row in self.probabilities(images)]
+
+
+def decode_image_bytes(data: bytes) -> np.ndarray:
+    if data.startswith(PNG_SIGNATURE):
+        from PIL import Image
         
-        top_probs, top_indices = torch.topk(probabilities[0], min(top_k, len(self.labels)))
+        image = Image.open(io.BytesIO(data))
+        if image.mode != 'L':
+            image = image.convert('L')
+        image = image.resize(IMAGE_SIZE, Image.Resampling.LANCZOS)
+        return np.asarray(image, dtype=np.float32) / 255.0
+    
+    if len(data) != IMAGE_SIZE[0] * IMAGE_SIZE[1]:
+        raise ValueError(
+            f"Expected {IMAGE_SIZE[0] * IMAGE_SIZE[1]} raw uint8 bytes or a PNG, got {len(data)} bytes"
+        )
+    
+    return np.frombuffer(data, dtype=np.uint8).reshape(IMAGE_SIZE).astype(np.float32) / 255.0
+
+
+def decode_image_batch(data: bytes) -> np.ndarray:
+    image_bytes = IMAGE_SIZE[0] * IMAGE_SIZE[1]
+    if not data or len(data) % image_bytes != 0:
+        raise ValueError(f"Expected a multiple of {image_bytes} raw uint8 bytes, got {len(data)} bytes")
+    
+    count = len(data) // image_bytes
+    if count > MAX_REQUEST_BATCH:
+        raise ValueError(f"Batch of {count} images exceeds the limit of {MAX_REQUEST_BATCH}")
+    
+    images = np.frombuffer(data, dtype=np.uint8).reshape(count, *IMAGE_SIZE)
+    return images.astype(np.float32) / 255.0
+
+
+def compact_predictions(manager: ModelManager, probabilities: np.ndarray, top_k: int) -> CompactPredictResponse:
+    top_indices = manager.top_k_indices(probabilities, top_k)
+    
+    return CompactPredictResponse(
+        labels=[manager.labels[idx] for idx in top_indices],
+        confidences=[round(float(probabilities[idx]), 4) for idx in top_indices],
+    )
+
+
+def verify_result(
+    manager: ModelManager, probabilities: np.ndarray, target: str, threshold: float, top_k: int
+) -> VerifyResponse:
+    # A target the model was never trained on can't be recognised, so it
+    # simply never passes instead of failing the request.
+    target_index = manager.target_index(target)
+    confidence = float(probabilities[target_index]) if target_index is not None else 0.0
+    top_indices = manager.top_k_indices(probabilities, top_k)
+    
+    return VerifyResponse(
+        target=target,
+        confidence=round(confidence, 4),
+        passed=confidence >= threshold,
+        labels=[manager.labels[idx] for idx in top_indices],
+        confidences=[round(float(probabilities[idx]), 4) for idx in top_indices],
+    )
+
+
+class ServingModel:
+    def __init__(self, version: str, manager: ModelManager):
+        self.version = version
+        self.manager = manager
+        self.executor: Optional[Executor] = None
+        self.batcher = MicroBatcher(
+            manager.probabilities,
+            max_batch_size=BATCH_MAX_SIZE,
+            window_ms=BATCH_WINDOW_MS,
+            max_concurrent_batches=INFERENCE_WORKERS,
+            max_queue_depth=MAX_QUEUE_DEPTH,
+            on_batch=lambda size, seconds: metrics.observe_batch(version, size, seconds),
+        )
+        self.cache = PredictionCache(
+            max_entries=PREDICTION_CACHE_SIZE,
+            ttl_seconds=PREDICTION_CACHE_TTL,
+            quant_bits=PREDICTION_CACHE_BITS,
+        )
+        self.small_batcher: Optional[MicroBatcher] = None
+        if manager.small_backend is not None:
+            self.small_batcher = MicroBatcher(
+                manager.small_probabilities,
+                max_batch_size=BATCH_MAX_SIZE,
+                window_ms=BATCH_WINDOW_MS,
+                max_concurrent_batches=INFERENCE_WORKERS,
+                max_queue_depth=MAX_QUEUE_DEPTH,
+                on_batch=lambda size, seconds: metrics.observe_batch(f"{version}/small", size, seconds, "forward_small"),
+            )
+        self.timings: Dict[str, float] = dict(manager.timings)
+    
+    @property
+    def batchers(self) -> List[MicroBatcher]:
+        return [batcher for batcher in (self.small_batcher, self.batcher) if batcher is not None]
+    
+    async def start(self) -> None:
+        if INFERENCE_EXECUTOR == "process":
+            from workers import create_process_pool, run_batch as run_worker_batch, run_small_batch
+            
+            self.executor = create_process_pool(
+                self.manager.backend, INFERENCE_WORKERS, TORCH_NUM_THREADS, self.manager.small_backend
+            )
+            self.batcher.run_batch = run_worker_batch
+            if self.small_batcher is not None:
+                self.small_batcher.run_batch = run_small_batch
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
         
-        predictions = []
-        for prob, idx in zip(top_probs.cpu().numpy(), top_indices.cpu().numpy()):
-            predictions.append(Prediction(
-                label=self.labels[idx],
-                confidence=float(prob)
-            ))
+        for batcher in self.batchers:
+            batcher.executor = self.executor
+        with timed(self.timings, "warmup"):
+            await self.warmup()
+        for batcher in self.batchers:
+            batcher.start()
+    
+    async def warmup(self) -> None:
+        # One call per worker and batch size spawns every worker process and
+        # lets the backend allocate its buffers before real traffic arrives.
+        loop = asyncio.get_running_loop()
+        
+        for batch_size in sorted({1, BATCH_MAX_SIZE}):
+            images = np.random.rand(batch_size, *IMAGE_SIZE).astype(np.float32)
+            for batcher in self.batchers:
+                await asyncio.gather(*(
+                    loop.run_in_executor(self.executor, batcher.run_batch, images)
+                    for _ in range(INFERENCE_WORKERS)
+                ))
+    
+    async def stop(self) -> None:
+        for batcher in self.batchers:
+            await batcher.stop()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+    
+    async def infer(
+        self, image: np.ndarray, target_index: Optional[int] = None, threshold: float = AI_CONFIDENCE_THRESHOLD
+    ) -> np.ndarray:
+        # Whether the cascade escalated depends on the target and threshold,
+        # so a small-model answer is only reused for the same pair.
+        tag = b""
+        if self.small_batcher is not None:
+            tag = struct.pack("<if", -1 if target_index is None else target_index, threshold)
+        
+        with metrics.stage("infer"):
+            probabilities = await self.cache.get_or_compute(
+                image, lambda: self.compute(image, target_index, threshold), tag
+            )
+        
+        if "first_prediction_ms" not in STARTUP_TIMINGS:
+            STARTUP_TIMINGS["first_prediction_ms"] = round((time.perf_counter() - IMPORT_STARTED) * 1000, 2)
+        
+        return probabilities
+    
+    async def compute(self, image: np.ndarray, target_index: Optional[int], threshold: float) -> np.ndarray:
+        if self.small_batcher is None:
+            return await self.batcher.submit(image)
         
-        return predictions
+        probabilities = await self.small_batcher.submit(image)
+        
+        # A verify only needs the full model when the target's confidence is
+        # close enough to its threshold that the two models could disagree
+        # on pass/fail; a plain prediction falls back to the top label.
+        confidence = probabilities[target_index] if target_index is not None else probabilities.max()
+        if abs(float(confidence) - threshold) >= CASCADE_MARGIN:
+            metrics.cascade.inc(self.version, "small")
+            return probabilities
+        
+        metrics.cascade.inc(self.version, "full")
+        return await self.batcher.submit(image)
+    
+    async def infer_many(
+        self,
+        images: np.ndarray,
+        target_indices: Optional[List[Optional[int]]] = None,
+        threshold: float = AI_CONFIDENCE_THRESHOLD,
+    ) -> List[np.ndarray]:
+        first = self.batchers[0]
+        if not first.has_capacity(len(images)):
+            raise QueueFullError(f"Inference queue is full ({first.depth} images pending)")
+        
+        if target_indices is None:
+            target_indices = [None] * len(images)
+        
+        return list(await asyncio.gather(*(
+            self.infer(image, target_index, threshold) for image, target_index in zip(images, target_indices)
+        )))
 
 
 app = FastAPI(
@@ -142,20 +548,127 @@ app = FastAPI(
     version="1.0.0",
 )
 
-model_manager = ModelManager()
+metrics = Metrics()
+app.add_middleware(MetricsMiddleware, metrics=metrics, routes=app.router.routes)
+
+registry = ModelRegistry(MODEL_REGISTRY_DIR, Path(__file__).parent / "model")
+live: Optional[ServingModel] = None
+previous: Optional[ServingModel] = None
+loading_version: Optional[str] = None
+swap_lock = asyncio.Lock()
+
+
+def serving_roles():
+    return [(role, serving) for role, serving in (("live", live), ("previous", previous)) if serving is not None]
+
+
+def serving_gauge(read):
+    return lambda: {(serving.version, role): read(serving) for role, serving in serving_roles()}
+
+
+metrics.gauge(
+    "model_info", "Loaded model versions and their backend", ("version", "role", "backend"),
+    collect=lambda: {(serving.version, role, serving.manager.backend.name): 1 for role, serving in serving_roles()},
+)
+metrics.gauge(
+    "queue_depth", "Images waiting in the inference queue", ("version", "role"),
+    collect=serving_gauge(lambda serving: sum(batcher.depth for batcher in serving.batchers)),
+)
+metrics.gauge(
+    "cache_entries", "Entries in the prediction cache", ("version", "role"),
+    collect=serving_gauge(lambda serving: serving.cache.stats()["entries"]),
+)
+metrics.gauge(
+    "cache_hit_rate", "Prediction cache hit rate (hits and coalesced lookups)", ("version", "role"),
+    collect=serving_gauge(lambda serving: serving.cache.stats()["hit_rate"]),
+)
+
+
+async def load_serving_model(version: str) -> Optional[ServingModel]:
+    manager = ModelManager()
+    loop = asyncio.get_running_loop()
+    
+    if not await loop.run_in_executor(None, manager.load, registry.path(version)):
+        return None
+    
+    serving = ServingModel(version, manager)
+    await serving.start()
+    return serving
+
+
+async def activate_version(version: str) -> None:
+    global live, previous, loading_version
+    
+    try:
+        serving = await load_serving_model(version)
+        if serving is None:
+            print(f"Model {version} failed to load, keeping {live.version if live else 'nothing'}")
+            return
+        
+        async with swap_lock:
+            retired = previous
+            previous, live = live, serving
+            registry.set_active(version)
+        
+        print(f"Now serving model {version} (previous: {previous.version if previous else None})")
+        print("Load: " + " | ".join(f"{phase[:-3]} {ms:.0f}ms" for phase, ms in serving.timings.items()))
+        
+        if retired is not None:
+            await retired.stop()
+    
+    except Exception as e:
+        print(f"Error activating model {version}: {e}")
+    finally:
+        loading_version = None
+
+
+def require_model() -> ServingModel:
+    serving = live
+    if serving is None or not serving.manager.is_loaded:
+        raise HTTPException(
+            status_code=503,
+            detail="Model not loaded. Run training first: python training/train.py"
+        )
+    return serving
+
+
+def require_admin(token: Optional[str]) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN not set)")
+    if token is None or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
 
 
 @app.on_event("startup")
 async def startup_event():
-    model_dir = Path(__file__).parent / "model"
-    success = model_manager.load(model_dir)
+    global live
     
-    if not success:
+    version = registry.active_version(pinned=MODEL_VERSION)
+    live = await load_serving_model(version)
+    
+    if live is None:
         print("\n" + "=" * 50)
         print("WARNING: Model not loaded!")
         print("The server will start but /predict will fail.")
         print("Run: python training/train.py")
         print("=" * 50 + "\n")
+        return
+    
+    STARTUP_TIMINGS.update(live.timings)
+    STARTUP_TIMINGS["total_ms"] = round((time.perf_counter() - IMPORT_STARTED) * 1000, 2)
+    
+    print(f"Serving model version: {version}")
+    print("Startup: " + " | ".join(f"{phase[:-3]} {ms:.0f}ms" for phase, ms in STARTUP_TIMINGS.items()))
+    print(f"Batching: up to {BATCH_MAX_SIZE} images per {BATCH_WINDOW_MS}ms window")
+    print(f"Inference: {INFERENCE_WORKERS} {INFERENCE_EXECUTOR} workers x {TORCH_NUM_THREADS} torch threads, "
+          f"queue limit {MAX_QUEUE_DEPTH}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for serving in (live, previous):
+        if serving is not None:
+            await serving.stop()
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -163,12 +676,77 @@ async def health_check():
     return HealthResponse(status="ok")
 
 
+@app.get("/startup")
+async def startup_timings():
+    return STARTUP_TIMINGS
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    serving = require_model()
+    return serving.cache.stats()
+
+
+@app.get("/admin/models")
+async def list_models(x_admin_token: Optional[str] = Header(default=None)):
+    require_admin(x_admin_token)
+    
+    return {
+        "versions": [DEFAULT_VERSION] + registry.versions(),
+        "active": live.version if live else None,
+        "previous": previous.version if previous else None,
+        "loading": loading_version,
+    }
+
+
+@app.post("/admin/models/{version}/activate", status_code=202)
+async def activate_model(version: str, x_admin_token: Optional[str] = Header(default=None)):
+    global loading_version
+    require_admin(x_admin_token)
+    
+    if not registry.has(version):
+        raise HTTPException(status_code=404, detail=f"Unknown model version '{version}'")
+    
+    if loading_version is not None:
+        raise HTTPException(status_code=409, detail=f"Model {loading_version} is already loading")
+    
+    # Claimed before the task is scheduled, so a second request arriving
+    # before it starts still sees the 409.
+    loading_version = version
+    asyncio.get_running_loop().create_task(activate_version(version))
+    return {"status": "loading", "version": version}
+
+
+@app.post("/admin/models/rollback")
+async def rollback_model(x_admin_token: Optional[str] = Header(default=None)):
+    global live, previous
+    require_admin(x_admin_token)
+    
+    async with swap_lock:
+        if previous is None:
+            raise HTTPException(status_code=409, detail="No previous model to roll back to")
+        
+        live, previous = previous, live
+        registry.set_active(live.version)
+    
+    print(f"Rolled back to model {live.version}")
+    return {"status": "ok", "active": live.version, "previous": previous.version}
+
+
 @app.post("/predict", response_model=PredictResponse)
-async def predict(request: PredictRequest):
-    if not model_manager.is_loaded:
+async def predict(request: PredictRequest, http_request: Request):
+    metrics.mark_parsed(http_request)
+    serving = require_model()
+    
+    if request.shape != [28, 28]:
         raise HTTPException(
-            status_code=503,
-            detail="Model not loaded. Run training first: python training/train.py"
+            status_code=400,
+            detail=f"Expected shape [28, 28], got {request.shape}"
         )
     
     expected_size = request.shape[0] * request.shape[1]
@@ -179,15 +757,242 @@ async def predict(request: PredictRequest):
         )
     
     try:
-        image = np.array(request.data, dtype=np.float32).reshape(request.shape)
-        predictions = model_manager.predict(image, top_k=request.top_k)
+        with metrics.stage("tensor"):
+            image = np.array(request.data, dtype=np.float32).reshape(request.shape)
+        
+        probabilities = await serving.infer(image)
+        
+        with metrics.stage("topk"):
+            response = PredictResponse(predictions=serving.manager.top_k(probabilities, top_k=request.top_k))
+        
+        metrics.mark_handled(http_request)
+        return response
+        
+    except QueueFullError as e:
+        metrics.rejected.inc()
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/predict_raw", response_model=CompactPredictResponse)
+async def predict_raw(
+    request: Request,
+    top_k: int = Query(default=5, ge=1, le=20, description="Number of top predictions to return"),
+):
+    serving = require_model()
+    body = await request.body()
+    metrics.mark_parsed(request)
+    
+    try:
+        with metrics.stage("tensor"):
+            image = decode_image_bytes(body)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        probabilities = await serving.infer(image)
         
-        return PredictResponse(predictions=predictions)
+        with metrics.stage("topk"):
+            response = compact_predictions(serving.manager, probabilities, top_k)
         
+        metrics.mark_handled(request)
+        return response
+        
+    except QueueFullError as e:
+        metrics.rejected.inc()
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/predict_batch", response_model=BatchPredictResponse)
+async def predict_batch(
+    request: Request,
+    top_k: int = Query(default=5, ge=1, le=20, description="Number of top predictions per image"),
+):
+    serving = require_model()
+    body = await request.body()
+    metrics.mark_parsed(request)
+    
+    try:
+        with metrics.stage("tensor"):
+            images = decode_image_batch(body)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        rows = await serving.infer_many(images)
+        
+        with metrics.stage("topk"):
+            response = BatchPredictResponse(results=[compact_predictions(serving.manager, row, top_k) for row in rows])
+        
+        metrics.mark_handled(request)
+        return response
+    
+    except QueueFullError as e:
+        metrics.rejected.inc()
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/verify", response_model=VerifyResponse)
+async def verify(
+    request: Request,
+    target: str = Query(..., description="Label the drawing should match"),
+    threshold: float = Query(default=AI_CONFIDENCE_THRESHOLD, ge=0, le=1, description="Confidence needed to pass"),
+    top_k: int = Query(default=0, ge=0, le=20, description="Number of top predictions to include"),
+):
+    serving = require_model()
+    body = await request.body()
+    metrics.mark_parsed(request)
+    
+    try:
+        with metrics.stage("tensor"):
+            image = decode_image_bytes(body)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        probabilities = await serving.infer(image, serving.manager.target_index(target), threshold)
+        
+        with metrics.stage("topk"):
+            response = verify_result(serving.manager, probabilities, target, threshold, top_k)
+        
+        metrics.mark_handled(request)
+        return response
+    
+    except QueueFullError as e:
+        metrics.rejected.inc()
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/verify_batch", response_model=BatchVerifyResponse)
+async def verify_batch(
+    request: Request,
+    target: List[str] = Query(..., description="One target per image, or a single target for all images"),
+    threshold: float = Query(default=AI_CONFIDENCE_THRESHOLD, ge=0, le=1, description="Confidence needed to pass"),
+    top_k: int = Query(default=0, ge=0, le=20, description="Number of top predictions per image"),
+):
+    serving = require_model()
+    body = await request.body()
+    metrics.mark_parsed(request)
+    
+    try:
+        with metrics.stage("tensor"):
+            images = decode_image_batch(body)
+        
+        if len(target) not in (1, len(images)):
+            raise ValueError(f"Expected 1 or {len(images)} targets, got {len(target)}")
+        
+        targets = target * len(images) if len(target) == 1 else target
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        rows = await serving.infer_many(
+            images, [serving.manager.target_index(row_target) for row_target in targets], threshold
+        )
+        
+        with metrics.stage("topk"):
+            response = BatchVerifyResponse(results=[
+                verify_result(serving.manager, row, row_target, threshold, top_k)
+                for row, row_target in zip(rows, targets)
+            ])
+        
+        metrics.mark_handled(request)
+        return response
+    
+    except QueueFullError as e:
+        metrics.rejected.inc()
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def stream_prediction(frame_id: int, top_k: int, threshold: float, target: str, data: bytes) -> dict:
+    try:
+        serving = require_model()
+    except HTTPException as e:
+        return {"id": frame_id, "status": e.status_code, "error": e.detail}
+    
+    try:
+        with metrics.stage("tensor"):
+            image = decode_image_bytes(data)
+    except Exception as e:
+        return {"id": frame_id, "status": 400, "error": str(e)}
+    
+    try:
+        if target:
+            probabilities = await serving.infer(image, serving.manager.target_index(target), threshold)
+        else:
+            probabilities = await serving.infer(image)
+        
+        with metrics.stage("topk"):
+            if target:
+                result = verify_result(serving.manager, probabilities, target, threshold, top_k)
+            else:
+                result = compact_predictions(serving.manager, probabilities, max(1, top_k))
+        
+        return {"id": frame_id, **result.model_dump()}
+    
+    except QueueFullError as e:
+        metrics.rejected.inc()
+        return {"id": frame_id, "status": 503, "error": str(e)}
+    except Exception as e:
+        return {"id": frame_id, "status": 500, "error": str(e)}
+
+
+@app.websocket("/predict_stream")
+async def predict_stream(websocket: WebSocket):
+    await websocket.accept()
+    
+    in_flight = asyncio.Semaphore(STREAM_MAX_IN_FLIGHT)
+    send_lock = asyncio.Lock()
+    tasks = set()
+    
+    async def handle(frame_id: int, top_k: int, threshold: float, target: str, data: bytes) -> None:
+        try:
+            message = await stream_prediction(frame_id, top_k, threshold, target, data)
+            metrics.requests.inc("/predict_stream", str(message.get("status", 200)))
+            
+            async with send_lock:
+                await websocket.send_text(json.dumps(message))
+        except Exception:
+            pass
+        finally:
+            in_flight.release()
+    
+    try:
+        while True:
+            frame = await websocket.receive_bytes()
+            if len(frame) < STREAM_HEADER.size:
+                continue
+            
+            # Stop reading once the connection has too many frames in flight,
+            # so a fast client gets TCP backpressure instead of a growing queue.
+            await in_flight.acquire()
+            
+            frame_id, top_k, threshold, target_length = STREAM_HEADER.unpack_from(frame)
+            target_end = STREAM_HEADER.size + target_length
+            target = frame[STREAM_HEADER.size:target_end].decode("utf-8", errors="replace")
+            
+            task = asyncio.get_running_loop().create_task(
+                handle(frame_id, min(20, top_k), threshold, target, frame[target_end:])
+            )
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
 if __name__ == "__main__":
     import uvicorn
     
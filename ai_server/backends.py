@@ -0,0 +1,100 @@
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from numpy_engine import NumpyCNN, softmax
+
+# torch is only imported by the backends that run it, so serving the .npz
+# export through NumpyBackend never pays for loading it.
+if TYPE_CHECKING:
+    import torch
+
+
+class InferenceBackend:
+    name = "base"
+    
+    def run(self, images: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+    
+    def share_memory(self) -> None:
+        pass
+
+
+class EagerBackend(InferenceBackend):
+    name = "eager"
+    
+    def __init__(self, model: "torch.nn.Module", device: "torch.device"):
+        self.model = model
+        self.device = device
+    
+    def run(self, images: np.ndarray) -> np.ndarray:
+        import torch
+        
+        tensor = torch.from_numpy(images).unsqueeze(1).to(self.device)
+        
+        with torch.no_grad():
+            return self.model(tensor).cpu().numpy()
+    
+    def share_memory(self) -> None:
+        self.model.share_memory()
+
+
+class TorchScriptBackend(EagerBackend):
+    name = "torchscript"
+    
+    def __init__(self, model_path: Path, device: "torch.device"):
+        import torch
+        
+        model = torch.jit.load(str(model_path), map_location=device)
+        model.eval()
+        super().__init__(model, device)
+        self.model_path = model_path
+    
+    def share_memory(self) -> None:
+        pass
+    
+    def __reduce__(self):
+        return TorchScriptBackend, (self.model_path, self.device)
+
+
+class OnnxBackend(InferenceBackend):
+    name = "onnx"
+    
+    def __init__(self, model_path: Path, num_threads: int = 0):
+        import onnxruntime as ort
+        
+        self.model_path = model_path
+        self.num_threads = num_threads
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        
+        self.session = ort.InferenceSession(
+            str(model_path),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_name = self.session.get_inputs()[0].name
+    
+    def run(self, images: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: images[:, np.newaxis]})[0]
+    
+    def __reduce__(self):
+        return OnnxBackend, (self.model_path, self.num_threads)
+
+
+class NumpyBackend(InferenceBackend):
+    name = "numpy"
+    
+    def __init__(self, model_path: Path):
+        self.model_path = model_path
+        self.model = NumpyCNN(model_path)
+    
+    def run(self, images: np.ndarray) -> np.ndarray:
+        return self.model.run(images)
+    
+    def __reduce__(self):
+        return NumpyBackend, (self.model_path,)
@@ -0,0 +1,148 @@
+import time
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        run_batch: Callable[[np.ndarray], Sequence],
+        max_batch_size: int = 32,
+        window_ms: float = 5.0,
+        executor: Optional[Executor] = None,
+        max_concurrent_batches: int = 1,
+        max_queue_depth: int = 0,
+        on_batch: Optional[Callable[[int, float], None]] = None,
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = max(0.0, window_ms) / 1000.0
+        self.executor = executor
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self.max_queue_depth = max_queue_depth
+        self.on_batch = on_batch
+        self.depth = 0
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight: set = set()
+    
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self) -> None:
+        if self.is_running:
+            return
+        
+        self._queue = asyncio.Queue()
+        self._batch_full = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._task = asyncio.get_running_loop().create_task(self._collect())
+    
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+    
+    def has_capacity(self, count: int = 1) -> bool:
+        return self.max_queue_depth <= 0 or self.depth + count <= self.max_queue_depth
+    
+    async def submit(self, image: np.ndarray):
+        if not self.is_running:
+            raise RuntimeError("Batcher not running")
+        
+        if not self.has_capacity():
+            raise QueueFullError(f"Inference queue is full ({self.depth} images pending)")
+        
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((image, future))
+        self.depth += 1
+        
+        if self._queue.qsize() + 1 >= self.max_batch_size:
+            self._batch_full.set()
+        
+        try:
+            return await future
+        finally:
+            self.depth -= 1
+    
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            # Only start forming a batch once a worker is free, so requests
+            # that arrive while every worker is busy end up in the next batch.
+            await self._slots.acquire()
+            try:
+                first = await self._queue.get()
+            except asyncio.CancelledError:
+                self._slots.release()
+                raise
+            
+            # Hold the first request for up to one window so concurrent
+            # requests can join it, unless a full batch is already waiting.
+            if self.window > 0 and self._queue.qsize() + 1 < self.max_batch_size:
+                self._batch_full.clear()
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.window)
+                except asyncio.TimeoutError:
+                    pass
+            
+            batch = [first]
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            task = loop.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+    
+    async def _dispatch(self, batch: List[Tuple[np.ndarray, asyncio.Future]]) -> None:
+        try:
+            batch = [(image, future) for image, future in batch if not future.done()]
+            if not batch:
+                return
+            
+            images = np.stack([image for image, _ in batch])
+            started = time.perf_counter()
+            try:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self.run_batch, images
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            
+            if self.on_batch is not None:
+                self.on_batch(len(images), time.perf_counter() - started)
+            
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._slots.release()
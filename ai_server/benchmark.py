@@ -0,0 +1,340 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import itertools
+import threading
+import subprocess
+import http.client
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+import numpy as np
+
+SERVER_DIR = Path(__file__).parent
+ENDPOINTS = ["predict", "predict_raw", "predict_batch", "verify"]
+
+
+def synthetic_images(count: int, seed: int = 0) -> np.ndarray:
+    from PIL import Image, ImageDraw
+    
+    # Dark strokes on a white 256px canvas, downsampled the same way the
+    # backend preprocesses real canvases.
+    rng = np.random.default_rng(seed)
+    images = []
+    
+    for _ in range(count):
+        canvas = Image.new("L", (256, 256), 255)
+        draw = ImageDraw.Draw(canvas)
+        
+        for _ in range(rng.integers(2, 7)):
+            steps = rng.integers(4, 16)
+            start = rng.uniform(40, 216, size=2)
+            walk = start + np.cumsum(rng.normal(0, 18, size=(steps, 2)), axis=0)
+            points = [tuple(p) for p in np.clip(np.vstack([start, walk]), 8, 248)]
+            draw.line(points, fill=0, width=int(rng.integers(4, 9)), joint="curve")
+        
+        image = canvas.resize((28, 28), Image.Resampling.LANCZOS)
+        images.append(np.asarray(image, dtype=np.float32) / 255.0)
+    
+    return np.stack(images)
+
+
+def quickdraw_images(labels: List[str], samples: int) -> np.ndarray:
+    sys.path.insert(0, str(SERVER_DIR))
+    from training.dataset import QuickDrawDataset
+    
+    dataset = QuickDrawDataset(categories=labels, samples_per_category=samples, split="val")
+    return np.stack(dataset.images)
+
+
+def encode(image: np.ndarray) -> bytes:
+    return (np.clip(image, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8).tobytes()
+
+
+def build_requests(endpoint: str, images: np.ndarray, labels: List[str], batch_size: int, top_k: int) -> List[tuple]:
+    # Payloads are encoded up front so the load generator spends its time
+    # waiting on the server rather than serialising requests.
+    requests = []
+    
+    if endpoint == "predict":
+        for image in images:
+            body = json.dumps({"shape": [28, 28], "data": image.flatten().tolist(), "top_k": top_k}).encode()
+            requests.append(("/predict", body, "application/json", 1))
+    
+    elif endpoint == "predict_raw":
+        for image in images:
+            requests.append((f"/predict_raw?top_k={top_k}", encode(image), "application/octet-stream", 1))
+    
+    elif endpoint == "predict_batch":
+        for start in range(0, len(images) - batch_size + 1, batch_size):
+            body = b"".join(encode(image) for image in images[start:start + batch_size])
+            requests.append((f"/predict_batch?top_k={top_k}", body, "application/octet-stream", batch_size))
+    
+    elif endpoint == "verify":
+        for i, image in enumerate(images):
+            target = quote(labels[i % len(labels)])
+            requests.append((f"/verify?target={target}&top_k={top_k}", encode(image), "application/octet-stream", 1))
+    
+    else:
+        raise ValueError(f"Unknown endpoint '{endpoint}'")
+    
+    return requests
+
+
+def process_tree_cpu_seconds(pid: int) -> Optional[float]:
+    # Sums utime + stime over the server and its children (process-pool
+    # workers). Linux only; returns None elsewhere.
+    proc = Path("/proc")
+    if not proc.exists():
+        return None
+    
+    ticks = os.sysconf("SC_CLK_TCK")
+    stats = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            fields = (entry / "stat").read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        stats[int(entry.name)] = (int(fields[1]), int(fields[11]) + int(fields[12]))
+    
+    tree = {pid}
+    changed = True
+    while changed:
+        children = {child for child, (parent, _) in stats.items() if parent in tree and child not in tree}
+        tree |= children
+        changed = bool(children)
+    
+    return sum(stats[p][1] for p in tree if p in stats) / ticks
+
+
+def percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def run_load(port: int, requests: List[tuple], concurrency: int, duration: float, warmup: float,
+             server_pid: int) -> dict:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    images_done = [0]
+    lock = threading.Lock()
+    counter = itertools.count()
+    
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+    
+    def worker():
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                break
+            
+            path, body, content_type, images = requests[next(counter) % len(requests)]
+            sent = time.perf_counter()
+            try:
+                connection.request("POST", path, body=body, headers={"Content-Type": content_type})
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                status = 0
+            elapsed = time.perf_counter() - sent
+            
+            if sent < measure_from:
+                continue
+            
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(elapsed * 1000)
+                    images_done[0] += images
+        
+        connection.close()
+    
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    
+    time.sleep(max(0.0, measure_from - time.perf_counter()))
+    cpu_before = process_tree_cpu_seconds(server_pid)
+    client_before = time.process_time()
+    
+    for thread in threads:
+        thread.join()
+    
+    cpu_after = process_tree_cpu_seconds(server_pid)
+    client_cpu = time.process_time() - client_before
+    wall = time.perf_counter() - measure_from
+    
+    ok = statuses.get(200, 0)
+    server_cpu = cpu_after - cpu_before if cpu_after is not None and cpu_before is not None else None
+    
+    return {
+        "requests": sum(statuses.values()),
+        "ok": ok,
+        "rejected": statuses.get(503, 0),
+        "errors": sum(count for status, count in statuses.items() if status not in (200, 503)),
+        "throughput_rps": round(ok / wall, 2),
+        "images_per_s": round(images_done[0] / wall, 2),
+        "latency_ms": {
+            "mean": round(float(np.mean(latencies)), 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(max(latencies), 3) if latencies else 0.0,
+        },
+        "server_cpu_percent": round(server_cpu / wall * 100, 1) if server_cpu is not None else None,
+        "server_cpu_ms_per_image": round(server_cpu * 1000 / images_done[0], 3)
+                                   if server_cpu is not None and images_done[0] else None,
+        "client_cpu_percent": round(client_cpu / wall * 100, 1),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(env_overrides: Dict[str, str], port: int, timeout: float) -> subprocess.Popen:
+    env = dict(os.environ, **env_overrides)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=str(SERVER_DIR),
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode} during startup")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            connection.request("GET", "/cache/stats")
+            status = connection.getresponse().status
+            connection.close()
+            if status == 200:
+                return server
+            if status == 503:
+                raise RuntimeError("Model not loaded, run training first: python training/train.py")
+        except OSError:
+            pass
+        time.sleep(0.25)
+    
+    server.terminate()
+    raise RuntimeError(f"Server did not become ready within {timeout}s")
+
+
+def fetch_json(port: int, path: str) -> dict:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    connection.request("GET", path)
+    data = json.loads(connection.getresponse().read())
+    connection.close()
+    return data
+
+
+def parse_matrix(entries: List[str]) -> List[Dict[str, str]]:
+    axes = []
+    for entry in entries:
+        key, _, values = entry.partition("=")
+        if not values:
+            raise ValueError(f"Expected KEY=v1,v2,... got '{entry}'")
+        axes.append([(key, value) for value in values.split(",")])
+    
+    return [dict(combo) for combo in itertools.product(*axes)] if axes else [{}]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the DraWar AI server across configurations")
+    parser.add_argument("--matrix", type=str, nargs="+", default=[],
+                        help="Server env settings to sweep, e.g. BATCH_WINDOW_MS=0,5 INFERENCE_WORKERS=1,2")
+    parser.add_argument("--endpoints", type=str, nargs="+", default=["predict", "predict_raw"],
+                        choices=ENDPOINTS, help="Endpoints to drive")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before each run")
+    parser.add_argument("--images", type=str, default="synthetic", choices=["synthetic", "quickdraw"],
+                        help="Source of test drawings")
+    parser.add_argument("--num-images", type=int, default=512, help="Distinct images (synthetic)")
+    parser.add_argument("--samples", type=int, default=20, help="Samples per category (quickdraw)")
+    parser.add_argument("--batch-size", type=int, default=16, help="Images per /predict_batch request")
+    parser.add_argument("--top-k", type=int, default=5, help="top_k sent with each request")
+    parser.add_argument("--startup-timeout", type=float, default=120.0, help="Seconds to wait for the server")
+    parser.add_argument("--output", type=str, default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+    
+    with open(SERVER_DIR / "model" / "labels.json", 'r') as f:
+        labels = json.load(f)
+    
+    if args.images == "quickdraw":
+        images = quickdraw_images(labels, args.samples)
+    else:
+        images = synthetic_images(args.num_images)
+    print(f"Using {len(images)} {args.images} images")
+    
+    # Identical frames would be answered by the prediction cache; disable it
+    # unless the sweep sets it explicitly.
+    base_env = {"PREDICTION_CACHE_SIZE": "0"}
+    results = []
+    
+    for overrides in parse_matrix(args.matrix):
+        config = dict(base_env, **overrides)
+        port = free_port()
+        
+        print("\n" + "=" * 50)
+        print("Config: " + " ".join(f"{key}={value}" for key, value in config.items()))
+        print("=" * 50)
+        
+        server = start_server(config, port, args.startup_timeout)
+        try:
+            startup = fetch_json(port, "/startup")
+            print(f"  Startup: {startup.get('total_ms', 0):.0f}ms")
+            
+            for endpoint in args.endpoints:
+                requests = build_requests(endpoint, images, labels, args.batch_size, args.top_k)
+                
+                for concurrency in args.concurrency:
+                    report = run_load(port, requests, concurrency, args.duration, args.warmup, server.pid)
+                    latency = report["latency_ms"]
+                    cpu = report["server_cpu_percent"]
+                    
+                    print(f"  {endpoint:<14} c={concurrency:<4} {report['throughput_rps']:>9.1f} req/s "
+                          f"{report['images_per_s']:>9.1f} img/s | p50 {latency['p50']:>8.2f} "
+                          f"p95 {latency['p95']:>8.2f} p99 {latency['p99']:>8.2f} ms | "
+                          f"cpu {cpu if cpu is not None else 'n/a'}% | "
+                          f"503s {report['rejected']} errors {report['errors']}")
+                    
+                    results.append({
+                        "config": config,
+                        "endpoint": endpoint,
+                        "concurrency": concurrency,
+                        "startup_ms": startup.get("total_ms"),
+                        **report,
+                    })
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                "images": args.images,
+                "duration": args.duration,
+                "cpu_count": os.cpu_count(),
+                "results": results,
+            }, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
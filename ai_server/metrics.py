@@ -0,0 +1,217 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from starlette.routing import Match
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+    
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+    
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{format_labels(self.label_names, labels)} {format_value(value)}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class Gauge:
+    kind = "gauge"
+    
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = (),
+                 collect: Callable[[], Dict[Tuple[str, ...], float]] = None):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.collect = collect
+        self.values: Dict[Tuple[str, ...], float] = {}
+    
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+    
+    def samples(self) -> List[str]:
+        values = self.collect() if self.collect is not None else self.values
+        return [
+            f"{self.name}{format_labels(self.label_names, labels)} {format_value(value)}"
+            for labels, value in sorted(values.items())
+        ]
+
+
+class Histogram:
+    kind = "histogram"
+    
+    def __init__(self, name: str, help: str, buckets: Sequence[float], label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.label_names = tuple(label_names)
+        self.series: Dict[Tuple[str, ...], List] = {}
+    
+    def observe(self, value: float, *labels: str) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * len(self.buckets), 0.0, 0]
+        
+        counts = series[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        series[1] += value
+        series[2] += 1
+    
+    def samples(self) -> List[str]:
+        lines = []
+        names = self.label_names + ("le",)
+        
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{format_labels(names, labels + (format_value(bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.label_names, labels)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+class Metrics:
+    def __init__(self, prefix: str = "drawar"):
+        self.prefix = prefix
+        self._metrics = []
+        
+        self.requests = self.counter("requests_total", "HTTP requests by route and status", ("route", "status"))
+        self.request_latency = self.histogram(
+            "request_duration_seconds", "End-to-end HTTP request latency", LATENCY_BUCKETS, ("route",)
+        )
+        self.stage_latency = self.histogram(
+            "stage_duration_seconds",
+            "Latency of each request stage (parse, tensor, infer, topk, serialize) and of batched forward passes",
+            LATENCY_BUCKETS,
+            ("stage",),
+        )
+        self.batch_size = self.histogram(
+            "inference_batch_size", "Images per forward pass", BATCH_SIZE_BUCKETS, ("version",)
+        )
+        self.images = self.counter("images_total", "Images run through the model", ("version",))
+        self.rejected = self.counter("rejected_total", "Requests rejected because the inference queue was full")
+        self.cascade = self.counter(
+            "cascade_frames_total", "Frames answered by each cascade stage (small or full model)", ("version", "stage")
+        )
+    
+    def counter(self, name: str, help: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(f"{self.prefix}_{name}", help, label_names))
+    
+    def gauge(self, name: str, help: str, label_names: Sequence[str] = (), collect=None) -> Gauge:
+        return self.register(Gauge(f"{self.prefix}_{name}", help, label_names, collect))
+    
+    def histogram(self, name: str, help: str, buckets: Sequence[float], label_names: Sequence[str] = ()) -> Histogram:
+        return self.register(Histogram(f"{self.prefix}_{name}", help, buckets, label_names))
+    
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+    
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_latency.observe(time.perf_counter() - started, name)
+    
+    def observe_batch(self, version: str, size: int, seconds: float, stage: str = "forward") -> None:
+        self.batch_size.observe(size, version)
+        self.images.inc(version, amount=size)
+        self.stage_latency.observe(seconds, stage)
+    
+    def mark_parsed(self, request) -> None:
+        # The middleware stamps the request on arrival, so everything up to
+        # the handler (body read, JSON decode, pydantic validation) is parse.
+        started = getattr(request.state, "metrics_started", None)
+        if started is not None:
+            self.stage_latency.observe(time.perf_counter() - started, "parse")
+    
+    def mark_handled(self, request) -> None:
+        request.state.metrics_handled = time.perf_counter()
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    def __init__(self, app, metrics: Metrics, routes: list):
+        self.app = app
+        self.metrics = metrics
+        self.routes = routes
+    
+    def route_of(self, scope) -> str:
+        # Label by route template rather than raw path to keep cardinality
+        # bounded (e.g. /admin/models/{version}/activate).
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return "other"
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        state = scope.setdefault("state", {})
+        state["metrics_started"] = started
+        status = 500
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            finished = time.perf_counter()
+            route = self.route_of(scope)
+            
+            self.metrics.requests.inc(route, str(status))
+            self.metrics.request_latency.observe(finished - started, route)
+            
+            handled = state.get("metrics_handled")
+            if handled is not None:
+                self.metrics.stage_latency.observe(finished - handled, "serialize")
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+def conv3x3(x: np.ndarray, weight: np.ndarray, bias: np.ndarray) -> np.ndarray:
+    # im2col over NHWC activations: every 3x3xC patch becomes one row, so the
+    # whole convolution is a single matmul against the (C*9, O) weights.
+    n, h, w, c = x.shape
+    padded = np.pad(x, ((0, 0), (1, 1), (1, 1), (0, 0)))
+    patches = sliding_window_view(padded, (3, 3), axis=(1, 2)).reshape(n * h * w, c * 9)
+    return (patches @ weight + bias).reshape(n, h, w, -1)
+
+
+def max_pool2x2(x: np.ndarray) -> np.ndarray:
+    n, h, w, c = x.shape
+    h2, w2 = h // 2, w // 2
+    return x[:, :h2 * 2, :w2 * 2].reshape(n, h2, 2, w2, 2, c).max(axis=(2, 4))
+
+
+# QuickDrawCNN forward pass in plain NumPy, loaded from the .npz written by
+# training/export.py (BatchNorm already folded into the conv weights).
+class NumpyCNN:
+    def __init__(self, model_path: Path):
+        with np.load(model_path) as data:
+            self.num_classes = int(data["num_classes"])
+            self.convs = []
+            for i in range(3):
+                weight = data[f"conv{i}_weight"]
+                self.convs.append((np.ascontiguousarray(weight.reshape(weight.shape[0], -1).T), data[f"conv{i}_bias"]))
+            
+            self.fc1 = (np.ascontiguousarray(data["fc1_weight"].T), data["fc1_bias"])
+            self.fc2 = (np.ascontiguousarray(data["fc2_weight"].T), data["fc2_bias"])
+    
+    def run(self, images: np.ndarray) -> np.ndarray:
+        x = images.astype(np.float32, copy=False)[..., np.newaxis]
+        
+        for weight, bias in self.convs:
+            x = max_pool2x2(np.maximum(conv3x3(x, weight, bias), 0.0))
+        
+        # nn.Flatten sees NCHW, so flatten in that order to match fc1.
+        x = x.transpose(0, 3, 1, 2).reshape(x.shape[0], -1)
+        
+        x = np.maximum(x @ self.fc1[0] + self.fc1[1], 0.0)
+        return x @ self.fc2[0] + self.fc2[1]
@@ -0,0 +1,59 @@
+import os
+import re
+from pathlib import Path
+from typing import List, Optional
+
+DEFAULT_VERSION = "default"
+
+
+def version_key(name: str) -> list:
+    # Digit runs compare as numbers, so v10 sorts after v9 and 1.2.10
+    # after 1.2.9; splitting keeps strings and ints at alternating slots.
+    return [int(part) if i % 2 else part for i, part in enumerate(re.split(r"(\d+)", name))]
+
+
+class ModelRegistry:
+    def __init__(self, root: Path, default_dir: Path):
+        self.root = root
+        self.default_dir = default_dir
+        self.active_file = root / "ACTIVE"
+    
+    def versions(self) -> List[str]:
+        if not self.root.is_dir():
+            return []
+        
+        return sorted(
+            (
+                path.name for path in self.root.iterdir()
+                if path.is_dir() and (path / "model.pt").exists() and (path / "labels.json").exists()
+            ),
+            key=version_key,
+        )
+    
+    def has(self, version: str) -> bool:
+        return version == DEFAULT_VERSION or version in self.versions()
+    
+    def path(self, version: str) -> Path:
+        if version == DEFAULT_VERSION:
+            return self.default_dir
+        return self.root / version
+    
+    def active_version(self, pinned: Optional[str] = None) -> str:
+        if pinned and self.has(pinned):
+            return pinned
+        
+        if self.active_file.exists():
+            version = self.active_file.read_text().strip()
+            if self.has(version):
+                return version
+        
+        versions = self.versions()
+        return versions[-1] if versions else DEFAULT_VERSION
+    
+    def set_active(self, version: str) -> None:
+        if not self.root.is_dir():
+            return
+        
+        tmp_file = self.active_file.with_suffix(".tmp")
+        tmp_file.write_text(version + "\n")
+        os.replace(tmp_file, self.active_file)
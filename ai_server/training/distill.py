@@ -0,0 +1,200 @@
+import sys
+import json
+import argparse
+from pathlib import Path
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+import torch.optim as optim
+from tqdm import tqdm
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from training.dataset import create_dataloaders
+from networks import QuickDrawCNN, TinyQuickDrawCNN
+
+
+def distillation_loss(
+    student_logits: torch.Tensor,
+    teacher_logits: torch.Tensor,
+    labels: torch.Tensor,
+    temperature: float,
+    alpha: float,
+) -> torch.Tensor:
+    soft = F.kl_div(
+        F.log_softmax(student_logits / temperature, dim=1),
+        F.softmax(teacher_logits / temperature, dim=1),
+        reduction="batchmean",
+    ) * temperature ** 2
+    hard = F.cross_entropy(student_logits, labels)
+    return alpha * soft + (1 - alpha) * hard
+
+
+def distill_epoch(
+    student: nn.Module,
+    teacher: nn.Module,
+    train_loader,
+    optimizer: optim.Optimizer,
+    device: torch.device,
+    temperature: float,
+    alpha: float,
+) -> float:
+    student.train()
+    total_loss = 0.0
+    
+    pbar = tqdm(train_loader, desc="Distilling", leave=False)
+    for images, labels in pbar:
+        images = images.to(device)
+        labels = labels.to(device)
+        
+        with torch.no_grad():
+            teacher_logits = teacher(images)
+        
+        optimizer.zero_grad()
+        loss = distillation_loss(student(images), teacher_logits, labels, temperature, alpha)
+        loss.backward()
+        optimizer.step()
+        
+        total_loss += loss.item()
+        pbar.set_postfix({"loss": f"{loss.item():.4f}"})
+    
+    return total_loss / len(train_loader)
+
+
+def evaluate_cascade(
+    student: nn.Module,
+    teacher: nn.Module,
+    val_loader,
+    device: torch.device,
+    threshold: float,
+    margin: float,
+) -> dict:
+    student.eval()
+    teacher.eval()
+    
+    total = 0
+    student_correct = 0
+    teacher_correct = 0
+    cascade_correct = 0
+    escalated = 0
+    win_agreement = 0
+    
+    with torch.no_grad():
+        for images, labels in val_loader:
+            images = images.to(device)
+            labels = labels.to(device)
+            
+            student_probs = F.softmax(student(images), dim=1)
+            teacher_probs = F.softmax(teacher(images), dim=1)
+            
+            uncertain = (student_probs.max(dim=1).values - threshold).abs() < margin
+            cascade_probs = torch.where(uncertain.unsqueeze(1), teacher_probs, student_probs)
+            
+            # A round is won when the target word crosses the threshold, so
+            # compare that decision rather than just the argmax.
+            teacher_wins = teacher_probs.gather(1, labels.unsqueeze(1)).squeeze(1) >= threshold
+            cascade_wins = cascade_probs.gather(1, labels.unsqueeze(1)).squeeze(1) >= threshold
+            
+            total += labels.size(0)
+            student_correct += (student_probs.argmax(dim=1) == labels).sum().item()
+            teacher_correct += (teacher_probs.argmax(dim=1) == labels).sum().item()
+            cascade_correct += (cascade_probs.argmax(dim=1) == labels).sum().item()
+            escalated += uncertain.sum().item()
+            win_agreement += (teacher_wins == cascade_wins).sum().item()
+    
+    return {
+        'accuracy': 100 * student_correct / total,
+        'teacher_accuracy': 100 * teacher_correct / total,
+        'cascade_accuracy': 100 * cascade_correct / total,
+        'escalation_rate': 100 * escalated / total,
+        'win_agreement': 100 * win_agreement / total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill QuickDraw CNN into a small first-stage model")
+    parser.add_argument("--epochs", type=int, default=10, help="Number of epochs")
+    parser.add_argument("--batch-size", type=int, default=64, help="Batch size")
+    parser.add_argument("--lr", type=float, default=0.002, help="Learning rate")
+    parser.add_argument("--samples", type=int, default=2000, help="Samples per category")
+    parser.add_argument("--temperature", type=float, default=4.0, help="Softmax temperature for soft targets")
+    parser.add_argument("--alpha", type=float, default=0.7, help="Weight of the soft-target loss")
+    parser.add_argument("--threshold", type=float, default=0.80, help="AI_CONFIDENCE_THRESHOLD used by the game")
+    parser.add_argument("--margin", type=float, default=0.15, help="CASCADE_MARGIN used by the server")
+    args = parser.parse_args()
+    
+    script_dir = Path(__file__).parent
+    model_dir = script_dir.parent / "model"
+    model_path = model_dir / "model.pt"
+    labels_path = model_dir / "labels.json"
+    output_path = model_dir / "model_small.pt"
+    
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    print(f"Using device: {device}")
+    
+    with open(labels_path, 'r') as f:
+        labels = json.load(f)
+    
+    checkpoint = torch.load(model_path, map_location=device, weights_only=False)
+    num_classes = checkpoint.get('num_classes', len(labels))
+    
+    teacher = QuickDrawCNN(num_classes=num_classes).to(device)
+    teacher.load_state_dict(checkpoint['model_state_dict'])
+    teacher.eval()
+    
+    print("\n" + "=" * 50)
+    print("Loading dataset...")
+    print("=" * 50)
+    
+    train_loader, val_loader, label_names = create_dataloaders(
+        categories=labels,
+        samples_per_category=args.samples,
+        batch_size=args.batch_size,
+    )
+    
+    if label_names != labels:
+        print("Error: dataset labels do not match labels.json, retrain the full model first")
+        sys.exit(1)
+    
+    student = TinyQuickDrawCNN(num_classes=num_classes).to(device)
+    print(f"\nTeacher parameters: {sum(p.numel() for p in teacher.parameters()):,}")
+    print(f"Student parameters: {sum(p.numel() for p in student.parameters()):,}")
+    
+    optimizer = optim.Adam(student.parameters(), lr=args.lr)
+    scheduler = optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=args.epochs)
+    
+    best_agreement = 0.0
+    
+    for epoch in range(args.epochs):
+        print(f"\nEpoch {epoch + 1}/{args.epochs}")
+        
+        train_loss = distill_epoch(student, teacher, train_loader, optimizer, device, args.temperature, args.alpha)
+        scheduler.step()
+        
+        report = evaluate_cascade(student, teacher, val_loader, device, args.threshold, args.margin)
+        
+        print(f"  Train Loss: {train_loss:.4f}")
+        print(f"  Student Accuracy: {report['accuracy']:.2f}% | Teacher: {report['teacher_accuracy']:.2f}% "
+              f"| Cascade: {report['cascade_accuracy']:.2f}%")
+        print(f"  Escalated: {report['escalation_rate']:.1f}% | Win agreement: {report['win_agreement']:.2f}%")
+        
+        if report['win_agreement'] > best_agreement:
+            best_agreement = report['win_agreement']
+            torch.save({
+                'model_state_dict': student.state_dict(),
+                'num_classes': num_classes,
+                'threshold': args.threshold,
+                'margin': args.margin,
+                **report,
+            }, output_path)
+            print(f"Saved best student (win agreement: {best_agreement:.2f}%)")
+    
+    print("\n" + "=" * 50)
+    print("Distillation complete!")
+    print("=" * 50)
+    print(f"Small model saved to: {output_path}")
+    print("Enable with: AI_CASCADE=true")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from networks import QuickDrawCNN
+from backends import EagerBackend, NumpyBackend, OnnxBackend, TorchScriptBackend
+
+CONV_BN_RELU_BLOCKS = [
+    ["features.0", "features.1", "features.2"],
+    ["features.4", "features.5", "features.6"],
+    ["features.8", "features.9", "features.10"],
+]
+NUMPY_TOLERANCE = 1e-3
+
+
+def load_model(model_path: Path) -> nn.Module:
+    checkpoint = torch.load(model_path, map_location="cpu", weights_only=False)
+    model = QuickDrawCNN(num_classes=checkpoint['num_classes'])
+    model.load_state_dict(checkpoint['model_state_dict'])
+    model.eval()
+    return model
+
+
+def fuse(model: nn.Module) -> nn.Module:
+    return torch.ao.quantization.fuse_modules(model, CONV_BN_RELU_BLOCKS)
+
+
+def export_torchscript(model: nn.Module, output_path: Path) -> None:
+    example = torch.rand(1, 1, 28, 28)
+    
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example)
+    frozen = torch.jit.freeze(traced)
+    frozen.save(str(output_path))
+    print(f"Saved TorchScript model to: {output_path}")
+
+
+def export_onnx(model: nn.Module, output_path: Path) -> None:
+    example = torch.rand(1, 1, 28, 28)
+    
+    torch.onnx.export(
+        model,
+        example,
+        str(output_path),
+        input_names=["image"],
+        output_names=["logits"],
+        dynamic_axes={"image": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=17,
+    )
+    print(f"Saved ONNX model to: {output_path}")
+
+
+def export_safetensors(model_path: Path, output_path: Path) -> None:
+    from safetensors.torch import save_file
+    
+    checkpoint = torch.load(model_path, map_location="cpu", weights_only=False)
+    state_dict = {key: tensor.contiguous() for key, tensor in checkpoint['model_state_dict'].items()}
+    metadata = {
+        "num_classes": str(checkpoint['num_classes']),
+        "accuracy": str(checkpoint.get('accuracy', 'N/A')),
+    }
+    
+    save_file(state_dict, str(output_path), metadata=metadata)
+    print(f"Saved safetensors weights to: {output_path}")
+
+
+def export_npz(model: nn.Module, output_path: Path) -> None:
+    arrays = {}
+    
+    with torch.no_grad():
+        for i, (conv_name, bn_name, _) in enumerate(CONV_BN_RELU_BLOCKS):
+            conv = model.get_submodule(conv_name)
+            bn = model.get_submodule(bn_name)
+            
+            # Fold BatchNorm's running statistics into the preceding conv:
+            # w' = w * gamma / sqrt(var + eps), b' = (b - mean) * scale + beta
+            scale = bn.weight / torch.sqrt(bn.running_var + bn.eps)
+            arrays[f"conv{i}_weight"] = (conv.weight * scale[:, None, None, None]).numpy()
+            arrays[f"conv{i}_bias"] = ((conv.bias - bn.running_mean) * scale + bn.bias).numpy()
+        
+        arrays["fc1_weight"] = model.classifier[1].weight.detach().numpy()
+        arrays["fc1_bias"] = model.classifier[1].bias.detach().numpy()
+        arrays["fc2_weight"] = model.classifier[4].weight.detach().numpy()
+        arrays["fc2_bias"] = model.classifier[4].bias.detach().numpy()
+        arrays["num_classes"] = np.array(model.classifier[4].out_features)
+    
+    np.savez(output_path, **arrays)
+    
+    check = np.random.rand(16, 28, 28).astype(np.float32)
+    expected = EagerBackend(model, torch.device("cpu")).run(check)
+    max_diff = float(np.abs(NumpyBackend(output_path).run(check) - expected).max())
+    
+    print(f"Saved NumPy model to: {output_path} (max |diff| vs eager: {max_diff:.2e})")
+    if max_diff > NUMPY_TOLERANCE:
+        print(f"Warning: NumPy engine differs from eager by more than {NUMPY_TOLERANCE}")
+
+
+def benchmark(backends: dict, batch_sizes: list, iterations: int) -> None:
+    reference = backends["eager"]
+    check = np.random.rand(8, 28, 28).astype(np.float32)
+    expected = reference.run(check)
+    
+    print("\n" + "=" * 50)
+    print("Backend benchmark (ms per call)")
+    print("=" * 50)
+    print(f"  {'backend':<14}" + "".join(f"{'batch ' + str(b):>12}" for b in batch_sizes) + f"{'max |diff|':>14}")
+    
+    for name, backend in backends.items():
+        timings = []
+        for batch_size in batch_sizes:
+            images = np.random.rand(batch_size, 28, 28).astype(np.float32)
+            for _ in range(10):
+                backend.run(images)
+            
+            start = time.perf_counter()
+            for _ in range(iterations):
+                backend.run(images)
+            timings.append((time.perf_counter() - start) / iterations * 1000)
+        
+        max_diff = float(np.abs(backend.run(check) - expected).max())
+        print(f"  {name:<14}" + "".join(f"{t:>12.3f}" for t in timings) + f"{max_diff:>14.2e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export QuickDraw CNN to TorchScript / ONNX / safetensors / NumPy")
+    parser.add_argument("--formats", type=str, nargs="+", default=["torchscript", "onnx", "safetensors", "npz"],
+                        choices=["torchscript", "onnx", "safetensors", "npz"], help="Formats to export")
+    parser.add_argument("--benchmark", action="store_true", help="Compare all backends after export")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32],
+                        help="Batch sizes used by --benchmark")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed iterations per batch size")
+    args = parser.parse_args()
+    
+    model_dir = Path(__file__).parent.parent / "model"
+    model_path = model_dir / "model.pt"
+    torchscript_path = model_dir / "model.ts"
+    onnx_path = model_dir / "model.onnx"
+    safetensors_path = model_dir / "model.safetensors"
+    npz_path = model_dir / "model.npz"
+    
+    model = load_model(model_path)
+    fused = fuse(load_model(model_path))
+    
+    if "torchscript" in args.formats:
+        export_torchscript(fused, torchscript_path)
+    
+    if "onnx" in args.formats:
+        export_onnx(fused, onnx_path)
+    
+    if "safetensors" in args.formats:
+        export_safetensors(model_path, safetensors_path)
+    
+    if "npz" in args.formats:
+        export_npz(model, npz_path)
+    
+    if not args.benchmark:
+        return
+    
+    device = torch.device("cpu")
+    backends = {
+        "eager": EagerBackend(model, device),
+        "eager-fused": EagerBackend(fused, device),
+    }
+    
+    if torchscript_path.exists():
+        backends["torchscript"] = TorchScriptBackend(torchscript_path, device)
+    
+    if onnx_path.exists():
+        try:
+            backends["onnx"] = OnnxBackend(onnx_path, num_threads=torch.get_num_threads())
+        except ImportError:
+            print("onnxruntime not installed, skipping ONNX benchmark")
+    
+    if npz_path.exists():
+        backends["numpy"] = NumpyBackend(npz_path)
+    
+    benchmark(backends, args.batch_sizes, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from training.dataset import QuickDrawDataset
+from networks import QuickDrawCNN
+from training.train import validate
+
+
+def quantize_dynamic(model: nn.Module) -> nn.Module:
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def measure_latency(model: nn.Module, batch_size: int, iterations: int) -> float:
+    images = torch.rand(batch_size, 1, 28, 28)
+    
+    with torch.no_grad():
+        for _ in range(10):
+            model(images)
+        
+        start = time.perf_counter()
+        for _ in range(iterations):
+            model(images)
+        elapsed = time.perf_counter() - start
+    
+    return elapsed / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize QuickDraw CNN to INT8")
+    parser.add_argument("--samples", type=int, default=500,
+                        help="Samples per category loaded for the validation split")
+    parser.add_argument("--batch-size", type=int, default=64, help="Validation batch size")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed iterations per latency run")
+    args = parser.parse_args()
+    
+    script_dir = Path(__file__).parent
+    model_dir = script_dir.parent / "model"
+    model_path = model_dir / "model.pt"
+    labels_path = model_dir / "labels.json"
+    output_path = model_dir / "model_int8.pt"
+    
+    device = torch.device("cpu")
+    
+    with open(labels_path, 'r') as f:
+        labels = json.load(f)
+    
+    checkpoint = torch.load(model_path, map_location=device, weights_only=False)
+    num_classes = checkpoint.get('num_classes', len(labels))
+    
+    model = QuickDrawCNN(num_classes=num_classes)
+    model.load_state_dict(checkpoint['model_state_dict'])
+    model.eval()
+    
+    quantized = quantize_dynamic(model)
+    
+    print("\n" + "=" * 50)
+    print("Loading validation split...")
+    print("=" * 50)
+    
+    val_dataset = QuickDrawDataset(
+        categories=labels,
+        samples_per_category=args.samples,
+        split="val",
+    )
+    val_loader = DataLoader(val_dataset, batch_size=args.batch_size, shuffle=False)
+    
+    criterion = nn.CrossEntropyLoss()
+    _, fp32_accuracy = validate(model, val_loader, criterion, device)
+    _, int8_accuracy = validate(quantized, val_loader, criterion, device)
+    
+    print("\n" + "=" * 50)
+    print("Results")
+    print("=" * 50)
+    print(f"  FP32 accuracy: {fp32_accuracy:.2f}%")
+    print(f"  INT8 accuracy: {int8_accuracy:.2f}%")
+    print(f"  Accuracy drop: {fp32_accuracy - int8_accuracy:.2f} points")
+    
+    for batch_size in (1, 32):
+        fp32_ms = measure_latency(model, batch_size, args.iterations)
+        int8_ms = measure_latency(quantized, batch_size, args.iterations)
+        print(f"  Batch {batch_size:>2}: FP32 {fp32_ms:.3f} ms | INT8 {int8_ms:.3f} ms "
+              f"({fp32_ms / int8_ms:.2f}x)")
+    
+    torch.save({
+        'model_state_dict': quantized.state_dict(),
+        'num_classes': num_classes,
+        'quantization': 'dynamic_int8',
+        'accuracy': int8_accuracy,
+        'fp32_accuracy': fp32_accuracy,
+    }, output_path)
+    
+    print(f"\nQuantized model saved to: {output_path}")
+    print(f"Size: {model_path.stat().st_size / 1024:.0f} KB -> {output_path.stat().st_size / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+from backends import InferenceBackend, softmax
+
+_backend: Optional[InferenceBackend] = None
+_small_backend: Optional[InferenceBackend] = None
+
+
+def init_worker(backend: InferenceBackend, num_threads: int,
+                small_backend: Optional[InferenceBackend] = None) -> None:
+    global _backend, _small_backend
+    torch.set_num_threads(num_threads)
+    _backend = backend
+    _small_backend = small_backend
+
+
+def run_batch(images: np.ndarray) -> np.ndarray:
+    return softmax(_backend.run(images))
+
+
+def run_small_batch(images: np.ndarray) -> np.ndarray:
+    return softmax(_small_backend.run(images))
+
+
+def create_process_pool(backend: InferenceBackend, num_workers: int, num_threads: int,
+                        small_backend: Optional[InferenceBackend] = None) -> ProcessPoolExecutor:
+    # Weights are moved into shared memory before the workers are spawned,
+    # so pickling the backend hands each worker a handle to the same pages
+    # instead of a private copy.
+    backend.share_memory()
+    if small_backend is not None:
+        small_backend.share_memory()
+    
+    return ProcessPoolExecutor(
+        max_workers=num_workers,
+        mp_context=mp.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(backend, num_threads, small_backend),
+    )
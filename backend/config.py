@@ -9,6 +9,35 @@ POINTS_PER_WIN = 1
 # AI settings
 AI_CONFIDENCE_THRESHOLD = 0.80 
 AI_SERVICE_URL = os.environ.get("AI_SERVICE_URL", "https://eriko256-drawar-ai.hf.space/predict") 
+AI_SERVICE_URLS = [url.strip() for url in os.environ.get("AI_SERVICE_URLS", AI_SERVICE_URL).split(",") if url.strip()]
+AI_SERVICE_BINARY = os.environ.get("AI_SERVICE_BINARY", "true").lower() == "true"
+AI_SERVICE_STREAM = os.environ.get("AI_SERVICE_STREAM", "true").lower() == "true"
+AI_DRAW_TIMEOUT = float(os.environ.get("AI_DRAW_TIMEOUT", 2.0))
+AI_SUBMIT_TIMEOUT = float(os.environ.get("AI_SUBMIT_TIMEOUT", 10.0))
+AI_MAX_RETRIES = int(os.environ.get("AI_MAX_RETRIES", 2))
+AI_POOL_SIZE = int(os.environ.get("AI_POOL_SIZE", 32))
+AI_BREAKER_FAILURES = int(os.environ.get("AI_BREAKER_FAILURES", 5))
+AI_BREAKER_RESET_SECONDS = float(os.environ.get("AI_BREAKER_RESET_SECONDS", 10.0))
+AI_MAX_CONCURRENCY = int(os.environ.get("AI_MAX_CONCURRENCY", 64))
+AI_MAX_IN_FLIGHT_PER_PLAYER = int(os.environ.get("AI_MAX_IN_FLIGHT_PER_PLAYER", 2))
+AI_PLAYER_RATE = float(os.environ.get("AI_PLAYER_RATE", 5.0))
+AI_PLAYER_BURST = float(os.environ.get("AI_PLAYER_BURST", 5.0))
+AI_LOBBY_RATE = float(os.environ.get("AI_LOBBY_RATE", 24.0))
+AI_LOBBY_BURST = float(os.environ.get("AI_LOBBY_BURST", 24.0))
+AI_SHED_QUEUE_DEPTH = int(os.environ.get("AI_SHED_QUEUE_DEPTH", 128))
+AI_FRAME_PIXEL_DELTA = float(os.environ.get("AI_FRAME_PIXEL_DELTA", 0.1))
+AI_FRAME_MAX_CHANGED_PIXELS = int(os.environ.get("AI_FRAME_MAX_CHANGED_PIXELS", 1))
+AI_FRAME_REUSE_SECONDS = float(os.environ.get("AI_FRAME_REUSE_SECONDS", 3.0))
+AI_BATCH_TICK_SECONDS = float(os.environ.get("AI_BATCH_TICK_SECONDS", 0.02))
+AI_BATCH_MAX_SIZE = int(os.environ.get("AI_BATCH_MAX_SIZE", 64))
+AI_PROBE_INTERVAL = float(os.environ.get("AI_PROBE_INTERVAL", 5.0))
+AI_HEDGE = os.environ.get("AI_HEDGE", "true").lower() == "true"
+AI_SERVICE_MODE = os.environ.get("AI_SERVICE_MODE", "remote").lower()
+AI_LOCAL_MODEL_DIR = os.environ.get(
+    "AI_LOCAL_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ai_server", "model"),
+)
+AI_LOCAL_THREADS = int(os.environ.get("AI_LOCAL_THREADS", 2))
 
 # Server settings
 PRODUCTION = os.environ.get("PRODUCTION", "false").lower() == "true"
@@ -16,3 +45,5 @@ DEBUG = os.environ.get("DEBUG", "true").lower() == "true" if not PRODUCTION else
 PORT = int(os.environ.get("PORT", 5003))
 SECRET_KEY = os.environ.get("SECRET_KEY", "drawar-secret-key-change-in-production")
 MAX_DRAW_UPDATES_PER_SECOND = 4
+MIN_DRAW_UPDATES_PER_SECOND = 0.5
+DRAW_CADENCE_INTERVAL = 2.0
@@ -190,7 +190,8 @@ def register_handlers(socketio):
                         'round_id': game.current_round.id if game and game.current_round else None,
                         'round_number': (game.rounds_played + 1) if game else 1,
                         'word': word,
-                        'duration': game.current_round.duration if game and game.current_round else 60
+                        'duration': game.current_round.duration if game and game.current_round else 60,
+                        'draw_updates_per_second': game_manager.draw_cadence.rate
                     }, room=lobby.id)
             
             socketio.start_background_task(start_after_countdown)
@@ -225,7 +226,8 @@ def register_handlers(socketio):
                         'round_id': game.current_round.id if game and game.current_round else None,
                         'round_number': (game.rounds_played + 1) if game else 1,
                         'word': word,
-                        'duration': game.current_round.duration if game and game.current_round else 60
+                        'duration': game.current_round.duration if game and game.current_round else 60,
+                        'draw_updates_per_second': game_manager.draw_cadence.rate
                     }, room=lobby.id)
             
             socketio.start_background_task(start_after_countdown)
@@ -252,27 +254,20 @@ def register_handlers(socketio):
         if not canvas_data:
             return
         
+        # The prediction is emitted as ai_prediction by the game manager once
+        # the AI call completes, so this handler never waits on the network.
         try:
-            result = game_manager.handle_draw_update(player.id, canvas_data)
+            accepted = game_manager.handle_draw_update(player.id, canvas_data)
         except Exception as e:
             print(f"Error handling draw update: {e}")
             emit('error', {'code': 'AI_ERROR', 'message': f"AI Service error: {str(e)}"})
             return
         
-        if result:
-            predictions, is_correct = result
-            
-            emit('ai_prediction', {
+        if accepted and player.current_lobby_id:
+            emit('player_drawing', {
                 'player_id': player.id,
-                'predictions': [p.to_dict() for p in predictions],
-                'is_correct': is_correct
-            })
-            
-            if player.current_lobby_id:
-                emit('player_drawing', {
-                    'player_id': player.id,
-                    'username': player.username
-                }, room=player.current_lobby_id, include_self=False)
+                'username': player.username
+            }, room=player.current_lobby_id, include_self=False)
     
     @socketio.on('submit_drawing')
     def handle_submit_drawing(data):
@@ -286,24 +281,16 @@ def register_handlers(socketio):
         if not canvas_data:
             return
         
+        # submission_result is emitted by the game manager when the AI answers.
         try:
-            result = game_manager.submit_drawing(player.id, canvas_data)
+            accepted, error_msg = game_manager.submit_drawing(player.id, canvas_data)
         except Exception as e:
             print(f"Error submitting drawing: {e}")
             emit('error', {'code': 'AI_ERROR', 'message': f"AI Service error: {str(e)}"})
             return
         
-        if result:
-            predictions, is_correct = result
-       
-            lobby = store.get_lobby(player.current_lobby_id) if player.current_lobby_id else None
-            
-            emit('submission_result', {
-                'player_id': player.id,
-                'predictions': [p.to_dict() for p in predictions],
-                'is_correct': is_correct,
-                'lobby': lobby.to_dict() if lobby else None
-            })
+        if not accepted and error_msg:
+            emit('error', {'code': 'AI_BUSY', 'message': error_msg})
     
     @socketio.on('get_lobby_state')
     def handle_get_lobby_state(data):
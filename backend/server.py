@@ -34,9 +34,20 @@ socketio = create_socketio(app)
 
 from backend.services.ai_service import set_ai_service
 from backend.services.remote_ai_service import RemoteAIService
-set_ai_service(RemoteAIService())
-from backend.config import AI_SERVICE_URL
-print(f"[AI] Using RemoteAIService -> {AI_SERVICE_URL}")
+from backend.config import AI_SERVICE_MODE, AI_SERVICE_URLS
+
+ai_service = None
+if AI_SERVICE_MODE == "local":
+    from backend.services.local_ai_service import LocalAIService
+    ai_service = LocalAIService.load()
+
+if ai_service is not None:
+    print("[AI] Using LocalAIService")
+else:
+    ai_service = RemoteAIService()
+    print(f"[AI] Using RemoteAIService -> {', '.join(AI_SERVICE_URLS)}")
+
+set_ai_service(ai_service)
 
 @app.route('/')
 def index():
@@ -46,10 +57,12 @@ def index():
 @app.route('/health')
 def health():
     from backend.state.game_store import store
+    from backend.services.game_manager import game_manager
     stats = store.get_stats()
     return {
         'status': 'healthy',
-        'stats': stats
+        'stats': stats,
+        'ai_scheduler': game_manager.ai_dispatcher.stats()
     }
 
 
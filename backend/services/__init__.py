@@ -5,6 +5,7 @@ __all__ = [
     'get_ai_service',
     'set_ai_service',
     'RemoteAIService',
+    'LocalAIService',
     'ImageProcessor',
     'image_processor',
 ]
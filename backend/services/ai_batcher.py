@@ -0,0 +1,62 @@
+from typing import Dict, List, Tuple
+
+import eventlet
+from eventlet.event import Event
+import numpy as np
+
+from backend.config import AI_BATCH_TICK_SECONDS, AI_BATCH_MAX_SIZE
+from backend.services.ai_service import get_ai_service, Verification
+
+
+class AIBatcher:
+    def __init__(self, tick_seconds: float = AI_BATCH_TICK_SECONDS, max_batch: int = AI_BATCH_MAX_SIZE):
+        self.tick = tick_seconds
+        self.max_batch = max_batch
+        self._pending: List[Tuple[np.ndarray, str, float, float, Event]] = []
+        self._timer = None
+    
+    def verify(self, image: np.ndarray, target: str, threshold: float, timeout: float) -> Verification:
+        if self.tick <= 0:
+            return get_ai_service().verify(image, target, threshold, timeout)
+        
+        # Requests from every lobby wait here for at most one tick and then
+        # go out together as a single verify_many call.
+        result = Event()
+        self._pending.append((image, target, threshold, timeout, result))
+        
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = eventlet.spawn_after(self.tick, self._flush)
+        
+        return result.wait()
+    
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        pending, self._pending = self._pending, []
+        
+        # verify_many takes one threshold and timeout, so draw updates and
+        # submissions are sent as separate batches.
+        groups: Dict[Tuple[float, float], list] = {}
+        for request in pending:
+            groups.setdefault((request[2], request[3]), []).append(request)
+        
+        for (threshold, timeout), requests in groups.items():
+            eventlet.spawn_n(self._send, requests, threshold, timeout)
+    
+    def _send(self, requests: list, threshold: float, timeout: float) -> None:
+        images = [request[0] for request in requests]
+        targets = [request[1] for request in requests]
+        
+        try:
+            verifications = get_ai_service().verify_many(images, targets, threshold, timeout)
+        except Exception as e:
+            for request in requests:
+                request[4].send_exception(e)
+            return
+        
+        for request, verification in zip(requests, verifications):
+            request[4].send(verification)
@@ -0,0 +1,189 @@
+import heapq
+import itertools
+from collections import deque
+from typing import Callable, Dict, Set
+
+import eventlet
+
+from backend.config import (
+    AI_MAX_CONCURRENCY,
+    AI_MAX_IN_FLIGHT_PER_PLAYER,
+    AI_PLAYER_RATE,
+    AI_PLAYER_BURST,
+    AI_LOBBY_RATE,
+    AI_LOBBY_BURST,
+    AI_SHED_QUEUE_DEPTH,
+)
+from backend.services.token_bucket import TokenBucket
+
+
+class AIDispatcher:
+    def __init__(
+        self,
+        max_concurrency: int = AI_MAX_CONCURRENCY,
+        max_per_player: int = AI_MAX_IN_FLIGHT_PER_PLAYER,
+        shed_queue_depth: int = AI_SHED_QUEUE_DEPTH,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_per_player = max_per_player
+        self.shed_queue_depth = shed_queue_depth
+        
+        self._in_flight: Dict[str, int] = {}
+        self._submits_in_flight: Set[str] = set()
+        self._running = 0
+        self._player_buckets: Dict[str, TokenBucket] = {}
+        self._lobby_buckets: Dict[str, TokenBucket] = {}
+        
+        # Submissions decide rounds, so they always go first. Draw updates are
+        # weighted-fair-queued across lobbies: each request's virtual finish
+        # tag advances its lobby by 1 / weight, so a lobby gets capacity in
+        # proportion to its weight and a busy lobby only delays itself.
+        self._priority = deque()
+        self._queue = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._lobby_finish: Dict[str, float] = {}
+        
+        self.admitted = {"draw": 0, "submit": 0}
+        self.shed = {"queue_full": 0, "in_flight": 0, "player_rate": 0, "lobby_rate": 0, "submit_in_flight": 0}
+    
+    def in_flight(self, player_id: str) -> int:
+        return self._in_flight.get(player_id, 0)
+    
+    def total_in_flight(self) -> int:
+        return sum(self._in_flight.values())
+    
+    def queue_depth(self) -> int:
+        return len(self._priority) + len(self._queue)
+    
+    def submit(
+        self,
+        player_id: str,
+        lobby_id: str,
+        job: Callable[[], object],
+        on_result: Callable[[object], None],
+        on_error: Callable[[Exception], None],
+        required: bool = False,
+        weight: float = 1.0,
+    ) -> bool:
+        request = (player_id, required, job, on_result, on_error)
+        
+        if required:
+            # Submissions jump the queue, so each player gets exactly one at
+            # a time; repeated clicks while it is pending are dropped.
+            if self.queue_depth() >= self.shed_queue_depth:
+                self.shed["queue_full"] += 1
+                return False
+            if player_id in self._submits_in_flight:
+                self.shed["submit_in_flight"] += 1
+                return False
+            
+            self.admitted["submit"] += 1
+            self._acquire(player_id)
+            self._submits_in_flight.add(player_id)
+            self._priority.append(request)
+            self._pump()
+            return True
+        
+        reason = self._shed_reason(player_id, lobby_id)
+        if reason is not None:
+            self.shed[reason] += 1
+            return False
+        
+        self.admitted["draw"] += 1
+        self._acquire(player_id)
+        
+        start = max(self._virtual_time, self._lobby_finish.get(lobby_id, 0.0))
+        finish = start + 1.0 / max(weight, 1.0)
+        self._lobby_finish[lobby_id] = finish
+        heapq.heappush(self._queue, (finish, next(self._seq), request))
+        
+        self._pump()
+        return True
+    
+    def forget(self, player_id: str = None, lobby_id: str = None) -> None:
+        self._player_buckets.pop(player_id, None)
+        self._lobby_buckets.pop(lobby_id, None)
+        self._lobby_finish.pop(lobby_id, None)
+    
+    def stats(self) -> dict:
+        return {
+            "running": self._running,
+            "queued": self.queue_depth(),
+            "admitted": dict(self.admitted),
+            "shed": dict(self.shed),
+        }
+    
+    def _shed_reason(self, player_id: str, lobby_id: str):
+        if self.queue_depth() >= self.shed_queue_depth:
+            return "queue_full"
+        
+        if self.in_flight(player_id) >= self.max_per_player:
+            return "in_flight"
+        
+        player_bucket = self._player_buckets.get(player_id)
+        if player_bucket is None:
+            player_bucket = self._player_buckets[player_id] = TokenBucket(AI_PLAYER_RATE, AI_PLAYER_BURST)
+        
+        lobby_bucket = self._lobby_buckets.get(lobby_id)
+        if lobby_bucket is None:
+            lobby_bucket = self._lobby_buckets[lobby_id] = TokenBucket(AI_LOBBY_RATE, AI_LOBBY_BURST)
+        
+        # Check both before taking either, so a frame refused by the lobby
+        # does not also cost the player a token.
+        if not player_bucket.has_token():
+            return "player_rate"
+        if not lobby_bucket.has_token():
+            return "lobby_rate"
+        
+        player_bucket.take()
+        lobby_bucket.take()
+        return None
+    
+    def _pump(self) -> None:
+        while self._running < self.max_concurrency and (self._priority or self._queue):
+            if self._priority:
+                request = self._priority.popleft()
+            else:
+                finish, _, request = heapq.heappop(self._queue)
+                self._virtual_time = finish
+            
+            # _running is the concurrency cap, so every job gets its own green
+            # thread; nothing ever runs inline on a finishing job's stack.
+            self._running += 1
+            eventlet.spawn_n(self._run, *request)
+    
+    def _run(self, player_id: str, required: bool, job, on_result, on_error) -> None:
+        try:
+            result = job()
+        except Exception as e:
+            self._release(player_id, required)
+            self._callback(on_error, e)
+        else:
+            self._release(player_id, required)
+            self._callback(on_result, result)
+        
+        # The slot is handed on only after the result has been delivered.
+        self._running -= 1
+        self._pump()
+    
+    def _acquire(self, player_id: str) -> None:
+        self._in_flight[player_id] = self.in_flight(player_id) + 1
+    
+    def _release(self, player_id: str, required: bool) -> None:
+        # Released before the callback so a follow-up frame (latest wins)
+        # can be admitted from inside it.
+        if required:
+            self._submits_in_flight.discard(player_id)
+        
+        remaining = self.in_flight(player_id) - 1
+        if remaining > 0:
+            self._in_flight[player_id] = remaining
+        else:
+            self._in_flight.pop(player_id, None)
+    
+    def _callback(self, callback, value) -> None:
+        try:
+            callback(value)
+        except Exception as e:
+            print(f"[AI] Error delivering result: {e}")
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import List, Optional
 import numpy as np
 
 @dataclass
@@ -14,11 +14,43 @@ class Prediction:
             "confidence": round(self.confidence, 3)
         }
 
+@dataclass
+class Verification:
+    target: str
+    confidence: float
+    passed: bool
+    predictions: List[Prediction] = field(default_factory=list)
+
+class AIServiceUnavailableError(RuntimeError):
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def verify_predictions(predictions: List[Prediction], target: str, threshold: float) -> Verification:
+    confidence = next(
+        (p.confidence for p in predictions if p.label.lower() == target.lower()),
+        0.0,
+    )
+    return Verification(target, confidence, confidence >= threshold, predictions)
+
 class AIServiceInterface(ABC):
     @abstractmethod
-    def predict(self, image: np.ndarray) -> List[Prediction]:
+    def predict(self, image: np.ndarray, timeout: Optional[float] = None) -> List[Prediction]:
         pass
     
+    def predict_many(self, images: List[np.ndarray], timeout: Optional[float] = None) -> List[List[Prediction]]:
+        return [self.predict(image, timeout) for image in images]
+    
+    def verify(
+        self, image: np.ndarray, target: str, threshold: float, timeout: Optional[float] = None
+    ) -> Verification:
+        return verify_predictions(self.predict(image, timeout), target, threshold)
+    
+    def verify_many(
+        self, images: List[np.ndarray], targets: List[str], threshold: float, timeout: Optional[float] = None
+    ) -> List[Verification]:
+        return [self.verify(image, target, threshold, timeout) for image, target in zip(images, targets)]
+    
     @abstractmethod
     def is_available(self) -> bool:
         pass
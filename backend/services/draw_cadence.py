@@ -0,0 +1,46 @@
+from typing import Optional
+
+from backend.config import MIN_DRAW_UPDATES_PER_SECOND, MAX_DRAW_UPDATES_PER_SECOND
+
+LATENCY_ALPHA = 0.2
+DEFAULT_LATENCY = 0.25
+
+
+class DrawCadence:
+    def __init__(
+        self,
+        capacity: int,
+        min_rate: float = MIN_DRAW_UPDATES_PER_SECOND,
+        max_rate: float = MAX_DRAW_UPDATES_PER_SECOND,
+    ):
+        self.capacity = max(1, capacity)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.latency: Optional[float] = None
+        self.rate = max_rate
+    
+    def observe(self, seconds: float) -> None:
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += LATENCY_ALPHA * (seconds - self.latency)
+    
+    def update(self, active_players: int, in_flight: int) -> float:
+        latency = self.latency if self.latency is not None else DEFAULT_LATENCY
+        
+        # With one frame in flight per player, nothing faster than one frame
+        # per round trip is useful, and all drawing players together must fit
+        # in what the AI pool can complete per second.
+        rate = min(1.0 / latency, self.capacity / (latency * max(1, active_players)))
+        
+        # Back off further while the pool is already busy so the queue drains.
+        utilization = in_flight / self.capacity
+        if utilization > 0.5:
+            rate *= max(0.25, 2.0 * (1.0 - utilization))
+        
+        self.rate = round(min(self.max_rate, max(self.min_rate, rate)), 2)
+        return self.rate
+    
+    def min_interval(self) -> float:
+        # A little slack for client timer jitter and network reordering.
+        return 0.8 / self.rate
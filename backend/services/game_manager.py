@@ -1,27 +1,72 @@
 from typing import Optional, Tuple, List
 from datetime import datetime
+import time
 import eventlet
+import numpy as np
 
 from backend.models.player import Player
 from backend.models.game import Game, GameState
+from backend.models.round import Round
 from backend.models.lobby import Lobby, LobbyState
 from backend.state.game_store import store
 from backend.services.word_generator import word_generator
 from backend.services.image_processor import image_processor
-from backend.services.ai_service import get_ai_service, Prediction
+from backend.services.ai_service import AIServiceUnavailableError, Verification
+from backend.services.ai_dispatcher import AIDispatcher
+from backend.services.ai_batcher import AIBatcher
+from backend.services.draw_cadence import DrawCadence
 from backend.config import (
     AI_CONFIDENCE_THRESHOLD,
-    MAX_DRAW_UPDATES_PER_SECOND,
+    AI_DRAW_TIMEOUT,
+    AI_SUBMIT_TIMEOUT,
+    AI_MAX_CONCURRENCY,
+    AI_FRAME_PIXEL_DELTA,
+    AI_FRAME_MAX_CHANGED_PIXELS,
+    AI_FRAME_REUSE_SECONDS,
+    DRAW_CADENCE_INTERVAL,
 )
 
+BLANK_CANVAS_RANGE = 0.05
+
 class GameManager:
     def __init__(self, socketio=None):
         self.socketio = socketio
         self._round_timers: dict[str, eventlet.greenthread.GreenThread] = {}
         self._player_rate_limits: dict[str, datetime] = {}
+        self.ai_dispatcher = AIDispatcher()
+        self.ai_batcher = AIBatcher()
+        self._draws_in_flight: set[str] = set()
+        self._pending_draws: dict[str, Tuple[Round, str]] = {}
+        self._last_frames: dict[str, Tuple[Round, np.ndarray, Verification, float]] = {}
+        self.draw_cadence = DrawCadence(AI_MAX_CONCURRENCY)
+        self._announced_rate = self.draw_cadence.rate
+        self._cadence_loop = None
     
     def set_socketio(self, socketio) -> None:
         self.socketio = socketio
+        if self._cadence_loop is None:
+            self._cadence_loop = eventlet.spawn(self._run_cadence_loop)
+    
+    def _run_cadence_loop(self) -> None:
+        while True:
+            eventlet.sleep(DRAW_CADENCE_INTERVAL)
+            try:
+                self._update_draw_cadence()
+            except Exception as e:
+                print(f"Error updating draw cadence: {e}")
+    
+    def _update_draw_cadence(self) -> None:
+        lobbies = store.get_playing_lobbies()
+        active_players = sum(lobby.player_count for lobby in lobbies)
+        rate = self.draw_cadence.update(active_players, self.ai_dispatcher.total_in_flight())
+        
+        # Only tell clients about changes that matter, not every wobble.
+        if abs(rate - self._announced_rate) < 0.1 * self._announced_rate or self.socketio is None:
+            return
+        
+        self._announced_rate = rate
+        for lobby in lobbies:
+            self.socketio.emit('draw_cadence', {'updates_per_second': rate}, room=lobby.id)
     
     def authenticate_player(self, socket_id: str, username: str) -> Player:
         player = Player(username=username, socket_id=socket_id)
@@ -45,8 +90,12 @@ class GameManager:
                 
                 if lobby.player_count == 0:
                     store.remove_lobby(lobby.id)
+                    self.ai_dispatcher.forget(lobby_id=lobby.id)
                     affected_lobby = None
         
+        self._pending_draws.pop(player.id, None)
+        self._last_frames.pop(player.id, None)
+        self.ai_dispatcher.forget(player_id=player.id)
         store.remove_player(player.id)
         return player, affected_lobby
     
@@ -113,6 +162,7 @@ class GameManager:
         
         if lobby.player_count == 0:
             store.remove_lobby(lobby.id)
+            self.ai_dispatcher.forget(lobby_id=lobby.id)
             return None
         
         return lobby
@@ -233,7 +283,8 @@ class GameManager:
                 'round_id': game.current_round.id,
                 'round_number': game.rounds_played + 1,
                 'word': word,
-                'duration': game.current_round.duration
+                'duration': game.current_round.duration,
+                'draw_updates_per_second': self.draw_cadence.rate
             }, room=lobby.id)
     
     def _end_game(self, game: Game, lobby: Lobby) -> None:
@@ -255,77 +306,201 @@ class GameManager:
         self, 
         player_id: str, 
         canvas_data: str
-    ) -> Optional[Tuple[List[Prediction], bool]]:
+    ) -> bool:
         player = store.get_player(player_id)
         if player is None or player.current_lobby_id is None:
-            return None
+            return False
         
         lobby = store.get_lobby(player.current_lobby_id)
         if lobby is None or lobby.current_game is None:
-            return None
+            return False
         
         game = lobby.current_game
         current_round = game.current_round
         if game.state != GameState.PLAYING or current_round is None:
-            return None
-        
-        target_word = current_round.word.lower()
+            return False
         
         if not self._check_rate_limit(player_id):
-            return None
-        
-        image_array = image_processor.process_canvas_data(canvas_data)
-        if image_array is None:
-            return None
+            return False
         
         current_round.update_drawing(player_id, canvas_data)
         
-        ai_service = get_ai_service()
-        predictions = ai_service.predict(image_array)
+        # Latest wins: while a frame is with the AI service only the newest
+        # canvas is kept, replacing any frame that was already waiting.
+        if player_id in self._draws_in_flight:
+            self._pending_draws[player_id] = (current_round, canvas_data)
+            return True
         
-        would_be_correct = any(
-            p.label.lower() == target_word and p.confidence >= AI_CONFIDENCE_THRESHOLD
-            for p in predictions
+        return self._dispatch_draw(player, current_round, canvas_data)
+    
+    def _dispatch_draw(self, player: Player, current_round: Round, canvas_data: str) -> bool:
+        target_word = current_round.word.lower()
+        
+        def verify_frame() -> Optional[Verification]:
+            # Decoded only once the frame is actually sent, so replaced
+            # frames cost nothing; frames from an ended round are skipped.
+            if not current_round.is_active:
+                return None
+            
+            image_array = image_processor.process_canvas_data(canvas_data)
+            if image_array is None or self._is_blank(image_array):
+                return None
+            
+            # Barely changed since the last frame we actually classified: the
+            # answer would be the same, so reuse it instead of asking again.
+            # Changed pixels are counted rather than averaged, so one short
+            # new stroke is never diluted by the rest of the canvas.
+            last = self._last_frames.get(player.id)
+            if last is not None and last[0] is current_round:
+                changed = int(np.count_nonzero(np.abs(image_array - last[1]) > AI_FRAME_PIXEL_DELTA))
+                if changed <= AI_FRAME_MAX_CHANGED_PIXELS:
+                    return last[2]
+            
+            started = time.monotonic()
+            try:
+                verification = self.ai_batcher.verify(image_array, target_word, AI_CONFIDENCE_THRESHOLD, AI_DRAW_TIMEOUT)
+            except Exception:
+                # Failures and timeouts are what overload looks like, so they
+                # count as a full timeout and pull the cadence down.
+                self.draw_cadence.observe(max(time.monotonic() - started, AI_DRAW_TIMEOUT))
+                raise
+            self.draw_cadence.observe(time.monotonic() - started)
+            
+            self._last_frames[player.id] = (current_round, image_array, verification, time.monotonic())
+            return verification
+        
+        # Lobbies are weighted by player count, so every drawing player gets
+        # the same share of AI capacity whichever lobby they are in.
+        lobby = store.get_lobby(player.current_lobby_id)
+        accepted = self.ai_dispatcher.submit(
+            player.id,
+            player.current_lobby_id,
+            verify_frame,
+            lambda verification: self._on_draw_result(player, current_round, verification),
+            lambda error: self._on_draw_error(player, error),
+            weight=lobby.player_count if lobby is not None else 1,
         )
+        if accepted:
+            self._draws_in_flight.add(player.id)
+        return accepted
+    
+    def _dispatch_pending_draw(self, player: Player) -> None:
+        self._draws_in_flight.discard(player.id)
+        
+        pending = self._pending_draws.pop(player.id, None)
+        if pending is None:
+            return
         
-        return predictions, would_be_correct
+        current_round, canvas_data = pending
+        if current_round.is_active:
+            self._dispatch_draw(player, current_round, canvas_data)
+    
+    def _on_draw_error(self, player: Player, error: Exception) -> None:
+        self._dispatch_pending_draw(player)
+        self._on_ai_error(player, error)
+    
+    def _on_draw_result(self, player: Player, current_round: Round, verification: Optional[Verification]) -> None:
+        self._dispatch_pending_draw(player)
+        
+        if verification is None or not current_round.is_active or self.socketio is None:
+            return
+        
+        self.socketio.emit('ai_prediction', {
+            'player_id': player.id,
+            'predictions': [p.to_dict() for p in verification.predictions],
+            'is_correct': verification.passed
+        }, room=player.socket_id)
     
     def submit_drawing(
         self, 
         player_id: str, 
         canvas_data: str
-    ) -> Optional[Tuple[List[Prediction], bool]]:
+    ) -> Tuple[bool, str]:
         player = store.get_player(player_id)
         if player is None or player.current_lobby_id is None:
-            return None
+            return False, ""
         
         lobby = store.get_lobby(player.current_lobby_id)
         if lobby is None or lobby.current_game is None:
-            return None
+            return False, ""
         
         game = lobby.current_game
         current_round = game.current_round
         if game.state != GameState.PLAYING or current_round is None:
-            return None
+            return False, ""
         
         target_word = current_round.word.lower()
         
         image_array = image_processor.process_canvas_data(canvas_data)
         if image_array is None:
-            return None
-        
-        ai_service = get_ai_service()
-        predictions = ai_service.predict(image_array)
-        
-        is_correct = any(
-            p.label.lower() == target_word and p.confidence >= AI_CONFIDENCE_THRESHOLD
-            for p in predictions
+            return False, ""
+        
+        if self._is_blank(image_array):
+            self._on_submission_result(player, game, lobby, current_round, Verification(target_word, 0.0, False))
+            return True, ""
+        
+        # The same canvas was classified by a draw update moments ago.
+        last = self._last_frames.get(player_id)
+        if last is not None and last[0] is current_round and np.array_equal(image_array, last[1]):
+            if time.monotonic() - last[3] < AI_FRAME_REUSE_SECONDS:
+                self._on_submission_result(player, game, lobby, current_round, last[2])
+                return True, ""
+        
+        accepted = self.ai_dispatcher.submit(
+            player_id,
+            lobby.id,
+            lambda: self.ai_batcher.verify(image_array, target_word, AI_CONFIDENCE_THRESHOLD, AI_SUBMIT_TIMEOUT),
+            lambda verification: self._on_submission_result(player, game, lobby, current_round, verification),
+            lambda error: self._on_ai_error(player, error),
+            required=True,
         )
+        if not accepted:
+            return False, "AI is busy, please submit again in a moment"
+        
+        return True, ""
+    
+    def _on_submission_result(
+        self,
+        player: Player,
+        game: Game,
+        lobby: Lobby,
+        current_round: Round,
+        verification: Verification,
+    ) -> None:
+        # The round may have ended (timeout or another winner) while this
+        # drawing was being classified; only a still-running round can be won.
+        is_correct = verification.passed and current_round.is_active and game.current_round is current_round
         
         if is_correct:
-            self._handle_correct_prediction(game, lobby, player_id)
+            self._handle_correct_prediction(game, lobby, player.id)
         
-        return predictions, is_correct
+        if self.socketio:
+            self.socketio.emit('submission_result', {
+                'player_id': player.id,
+                'predictions': [p.to_dict() for p in verification.predictions],
+                'is_correct': is_correct,
+                'lobby': lobby.to_dict()
+            }, room=player.socket_id)
+    
+    def _on_ai_error(self, player: Player, error: Exception) -> None:
+        if self.socketio is None:
+            return
+        
+        if isinstance(error, AIServiceUnavailableError):
+            self.socketio.emit('ai_degraded', {
+                'message': str(error),
+                'retry_after': round(error.retry_after, 1)
+            }, room=player.socket_id)
+            return
+        
+        print(f"Error in AI request: {error}")
+        self.socketio.emit('error', {
+            'code': 'AI_ERROR',
+            'message': f"AI Service error: {str(error)}"
+        }, room=player.socket_id)
+    
+    def _is_blank(self, image_array: np.ndarray) -> bool:
+        return float(image_array.max() - image_array.min()) < BLANK_CANVAS_RANGE
     
     def _check_rate_limit(self, player_id: str) -> bool:
         now = datetime.now()
@@ -333,8 +508,7 @@ class GameManager:
         
         if last_update:
             elapsed = (now - last_update).total_seconds()
-            min_interval = 1.0 / MAX_DRAW_UPDATES_PER_SECOND
-            if elapsed < min_interval:
+            if elapsed < self.draw_cadence.min_interval():
                 return False
         
         self._player_rate_limits[player_id] = now
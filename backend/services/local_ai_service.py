@@ -0,0 +1,123 @@
+import json
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+from eventlet import tpool
+
+from ai_server.numpy_engine import NumpyCNN, softmax
+from backend.config import AI_LOCAL_MODEL_DIR, AI_LOCAL_THREADS
+from backend.services.ai_service import AIServiceInterface, Prediction, Verification
+from backend.services.remote_ai_service import check_shape
+
+
+def load_torch_forward(model_path: Path, num_labels: int) -> Callable[[np.ndarray], np.ndarray]:
+    import torch
+    
+    from ai_server.networks import QuickDrawCNN
+    
+    torch.set_num_threads(AI_LOCAL_THREADS)
+    checkpoint = torch.load(model_path, map_location="cpu", weights_only=False)
+    
+    model = QuickDrawCNN(num_classes=checkpoint.get('num_classes') or num_labels)
+    model.load_state_dict(checkpoint['model_state_dict'])
+    model.eval()
+    
+    def forward(batch: np.ndarray) -> np.ndarray:
+        with torch.no_grad():
+            return model(torch.from_numpy(batch).unsqueeze(1)).numpy()
+    
+    return forward
+
+
+class LocalAIService(AIServiceInterface):
+    def __init__(self, forward: Callable[[np.ndarray], np.ndarray], labels: List[str], top_k: int = 5):
+        self.forward = forward
+        self.labels = labels
+        self.label_indices = {label.lower(): idx for idx, label in enumerate(labels)}
+        self.top_k = top_k
+    
+    @classmethod
+    def load(cls, model_dir: str = AI_LOCAL_MODEL_DIR) -> Optional["LocalAIService"]:
+        model_path = Path(model_dir) / "model.pt"
+        npz_path = Path(model_dir) / "model.npz"
+        labels_path = Path(model_dir) / "labels.json"
+        
+        if not labels_path.exists():
+            print(f"[AI] No labels.json in {model_dir}, local inference unavailable")
+            return None
+        
+        # The NumPy export needs no torch at all; use it unless model.pt has
+        # been retrained since it was written.
+        use_npz = npz_path.exists() and (
+            not model_path.exists() or npz_path.stat().st_mtime >= model_path.stat().st_mtime
+        )
+        
+        try:
+            with open(labels_path, 'r') as f:
+                labels = json.load(f)
+            
+            if use_npz:
+                source = npz_path
+                forward = NumpyCNN(npz_path).run
+            elif model_path.exists():
+                source = model_path
+                forward = load_torch_forward(model_path, len(labels))
+            else:
+                print(f"[AI] No model.npz/model.pt in {model_dir}, local inference unavailable")
+                return None
+        
+        except ImportError as e:
+            print(f"[AI] Local inference unavailable: {e}")
+            return None
+        except Exception as e:
+            print(f"[AI] Failed to load local model: {e}")
+            return None
+        
+        print(f"[AI] Loaded local model with {len(labels)} classes from {source}")
+        return cls(forward, labels)
+    
+    def predict(self, image: np.ndarray, timeout: Optional[float] = None) -> List[Prediction]:
+        return self.predict_many([image], timeout)[0]
+    
+    def predict_many(self, images: List[np.ndarray], timeout: Optional[float] = None) -> List[List[Prediction]]:
+        return [self._top_k(probs) for probs in self._probabilities(images)]
+    
+    def verify(
+        self, image: np.ndarray, target: str, threshold: float, timeout: Optional[float] = None
+    ) -> Verification:
+        return self.verify_many([image], [target], threshold, timeout)[0]
+    
+    def verify_many(
+        self, images: List[np.ndarray], targets: List[str], threshold: float, timeout: Optional[float] = None
+    ) -> List[Verification]:
+        verifications = []
+        
+        for probs, target in zip(self._probabilities(images), targets):
+            # Read the target straight from the full distribution, so a word
+            # just outside the top-k still gets its real confidence.
+            idx = self.label_indices.get(target.lower())
+            confidence = float(probs[idx]) if idx is not None else 0.0
+            verifications.append(Verification(target, confidence, confidence >= threshold, self._top_k(probs)))
+        
+        return verifications
+    
+    def _probabilities(self, images: List[np.ndarray]) -> np.ndarray:
+        if not images:
+            return np.empty((0, len(self.labels)), dtype=np.float32)
+        
+        for image in images:
+            check_shape(image)
+        
+        batch = np.stack(images).astype(np.float32, copy=False)
+        
+        # The forward pass runs on a native thread so it doesn't stall the
+        # eventlet hub (and every other lobby) while the CPU is busy.
+        return softmax(tpool.execute(self.forward, batch))
+    
+    def _top_k(self, probs: np.ndarray) -> List[Prediction]:
+        top = np.argsort(probs)[::-1][:self.top_k]
+        return [Prediction(label=self.labels[idx], confidence=float(probs[idx])) for idx in top]
+    
+    def is_available(self) -> bool:
+        return True
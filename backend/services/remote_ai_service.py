@@ -1,38 +1,631 @@
 import json
-from typing import List, Optional
+import time
+import random
+import queue
+import struct
+import itertools
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 
-from backend.config import AI_SERVICE_URL
-from backend.services.ai_service import AIServiceInterface, Prediction
+from backend.config import (
+    AI_SERVICE_URLS,
+    AI_SERVICE_BINARY,
+    AI_SERVICE_STREAM,
+    AI_DRAW_TIMEOUT,
+    AI_SUBMIT_TIMEOUT,
+    AI_MAX_RETRIES,
+    AI_POOL_SIZE,
+    AI_BREAKER_FAILURES,
+    AI_BREAKER_RESET_SECONDS,
+    AI_HEDGE,
+    AI_PROBE_INTERVAL,
+)
+from backend.services.ai_service import (
+    AIServiceInterface,
+    AIServiceUnavailableError,
+    Prediction,
+    Verification,
+    verify_predictions,
+)
+from backend.services.circuit_breaker import CircuitBreaker
+
+RETRY_STATUSES = {502, 503, 504}
+RETRY_BACKOFF = 0.05
+
+LATENCY_WINDOW = 200
+MIN_HEDGE_SAMPLES = 20
+EWMA_ALPHA = 0.2
+DEFAULT_LATENCY = 0.1
+MAX_ERROR_RATE = 0.5
+
+
+def encode_image(image: np.ndarray) -> bytes:
+    return (np.clip(image, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8).tobytes()
+
+
+def check_shape(image: np.ndarray) -> None:
+    if image.shape != (28, 28):
+        raise ValueError(f"Expected shape (28, 28) and got {image.shape}")
+
+
+def decode_compact(result: dict) -> List[Prediction]:
+    return [
+        Prediction(label=label, confidence=confidence)
+        for label, confidence in zip(result["labels"], result["confidences"])
+    ]
+
+
+def decode_verification(result: dict) -> Verification:
+    return Verification(
+        target=result["target"],
+        confidence=result["confidence"],
+        passed=result["passed"],
+        predictions=decode_compact(result),
+    )
+
+
+class StreamUnavailableError(RuntimeError):
+    pass
+
+
+# Pipelines frames over one long-lived WebSocket to /predict_stream. Each
+# frame is tagged with an id and a reader thread hands replies back to the
+# waiting caller, so many frames can be in flight on one connection.
+class AIStreamClient:
+    HEADER = struct.Struct(">IBfH")
+    
+    def __init__(self, url: str, connect_timeout: float = 5.0, reconnect_interval: float = 30.0):
+        self.url = url
+        self.connect_timeout = connect_timeout
+        self.reconnect_interval = reconnect_interval
+        self.enabled = True
+        
+        self._ws = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, queue.Queue] = {}
+        self._retry_at = 0.0
+        self._connecting = False
+    
+    def predict(self, image: np.ndarray, top_k: int, timeout: float) -> List[Prediction]:
+        return self.predict_many([image], top_k, timeout)[0]
+    
+    def predict_many(self, images: List[np.ndarray], top_k: int, timeout: float) -> List[List[Prediction]]:
+        results = self._request([(image, "", 0.0) for image in images], top_k, timeout)
+        
+        try:
+            return [decode_compact(result) for result in results]
+        except KeyError as e:
+            raise RuntimeError(f"Failed to parse: {e}") from e
+    
+    def verify(self, image: np.ndarray, target: str, threshold: float, top_k: int, timeout: float) -> Verification:
+        return self.verify_many([image], [target], threshold, top_k, timeout)[0]
+    
+    def verify_many(
+        self, images: List[np.ndarray], targets: List[str], threshold: float, top_k: int, timeout: float
+    ) -> List[Verification]:
+        results = self._request([(image, target, threshold) for image, target in zip(images, targets)], top_k, timeout)
+        
+        try:
+            return [decode_verification(result) for result in results]
+        except KeyError as e:
+            raise RuntimeError(f"Failed to parse: {e}") from e
+    
+    def _request(self, frames: List[Tuple[np.ndarray, str, float]], top_k: int, timeout: float) -> List[dict]:
+        # A batch is pipelined as individual frames on the one connection;
+        # the server's micro-batcher groups them again on its side.
+        deadline = time.monotonic() + timeout
+        waiters: Dict[int, queue.Queue] = {}
+        
+        try:
+            ws = self._connect()
+            with self._lock:
+                if self._ws is not ws:
+                    raise StreamUnavailableError("AI stream closed")
+                
+                for image, target, threshold in frames:
+                    frame_id = next(self._ids) & 0xFFFFFFFF
+                    target_bytes = target.encode("utf-8")
+                    frame = self.HEADER.pack(frame_id, top_k, threshold, len(target_bytes)) + target_bytes
+                    
+                    waiter = queue.Queue(maxsize=1)
+                    self._pending[frame_id] = waiter
+                    waiters[frame_id] = waiter
+                    try:
+                        ws.send_binary(frame + encode_image(image))
+                    except Exception as e:
+                        self._drop(ws)
+                        raise StreamUnavailableError(f"AI stream send failed: {e}") from e
+            
+            results = []
+            for waiter in waiters.values():
+                try:
+                    result = waiter.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    raise RuntimeError(f"AI service failed: no reply on stream within {timeout}s")
+                
+                if "error" in result:
+                    raise RuntimeError(f"AI service failed: {result.get('status')} {result['error']}")
+                results.append(result)
+        
+        finally:
+            for frame_id in waiters:
+                self._pending.pop(frame_id, None)
+        
+        return results
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._ws is not None:
+                self._drop(self._ws)
+    
+    def _connect(self):
+        # Only one caller dials; everyone else goes straight to HTTP until
+        # the connection is up, instead of queueing on the lock behind a
+        # handshake that may take up to connect_timeout.
+        with self._lock:
+            if self._ws is not None:
+                return self._ws
+            
+            if self._connecting or not self.enabled or time.monotonic() < self._retry_at:
+                raise StreamUnavailableError("AI stream not connected")
+            
+            self._connecting = True
+        
+        try:
+            ws = self._dial()
+        finally:
+            with self._lock:
+                self._connecting = False
+        
+        with self._lock:
+            self._ws = ws
+        threading.Thread(target=self._read, args=(ws,), daemon=True).start()
+        print(f"[AI] Streaming predictions over {self.url}")
+        return ws
+    
+    def _dial(self):
+        try:
+            import websocket
+        except ImportError:
+            print("[AI] websocket-client not installed, using HTTP")
+            self.enabled = False
+            raise StreamUnavailableError("AI stream needs websocket-client")
+        
+        try:
+            ws = websocket.create_connection(self.url, timeout=self.connect_timeout)
+        except websocket.WebSocketBadStatusException as e:
+            if e.status_code in (403, 404):
+                print(f"[AI] {self.url} not available ({e.status_code}), using HTTP")
+                self.enabled = False
+            self._retry_at = time.monotonic() + self.reconnect_interval
+            raise StreamUnavailableError(f"AI stream handshake failed: {e}") from e
+        except Exception as e:
+            self._retry_at = time.monotonic() + self.reconnect_interval
+            raise StreamUnavailableError(f"AI stream connect failed: {e}") from e
+        
+        ws.settimeout(None)
+        return ws
+    
+    def _read(self, ws) -> None:
+        try:
+            while True:
+                message = json.loads(ws.recv())
+                waiter = self._pending.get(message.get("id"))
+                if waiter is not None:
+                    waiter.put(message)
+        
+        except Exception as e:
+            print(f"[AI] Stream closed: {e}")
+        
+        finally:
+            with self._lock:
+                if self._ws is ws:
+                    self._drop(ws)
+    
+    def _drop(self, ws) -> None:
+        # Called with the lock held. Frames still pending were all sent on
+        # this connection, so none of them will get a reply any more.
+        self._ws = None
+        for waiter in self._pending.values():
+            if waiter.empty():
+                waiter.put({"status": 503, "error": "AI stream closed"})
+        
+        try:
+            ws.close()
+        except Exception:
+            pass
+
+
+# Per-replica state: the URLs, which protocol features that replica
+# supports, and the load and latency figures used for routing and hedging.
+class AIEndpoint:
+    def __init__(self, predict_url: str, use_binary: bool, use_stream: bool):
+        self.predict_url = predict_url
+        
+        base_url = predict_url.rsplit('/predict', 1)[0]
+        self.raw_predict_url = f"{base_url}/predict_raw"
+        self.batch_predict_url = f"{base_url}/predict_batch"
+        self.verify_url = f"{base_url}/verify"
+        self.verify_batch_url = f"{base_url}/verify_batch"
+        self.stream_url = f"{base_url}/predict_stream".replace("http", "ws", 1)
+        self.health_url = f"{base_url}/health"
+        
+        self.use_binary = use_binary
+        self.use_batch = use_binary
+        self.use_verify = use_binary
+        self.stream = AIStreamClient(self.stream_url) if use_stream and use_binary else None
+        
+        self.healthy = True
+        self.outstanding = 0
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self._samples = deque(maxlen=LATENCY_WINDOW)
+    
+    @property
+    def available(self) -> bool:
+        return self.healthy and self.error_rate < MAX_ERROR_RATE
+    
+    def record(self, seconds: float, ok: bool, request: bool = True) -> None:
+        self.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+        if not ok:
+            return
+        
+        self.latency = seconds if self.latency is None else self.latency + EWMA_ALPHA * (seconds - self.latency)
+        if request:
+            self._samples.append(seconds)
+    
+    def cost(self) -> float:
+        # Least outstanding requests, weighted by how quickly and reliably
+        # this replica has been answering.
+        latency = self.latency if self.latency is not None else DEFAULT_LATENCY
+        return (self.outstanding + 1) * latency / (1.0 - min(self.error_rate, 0.9))
+    
+    def p95(self) -> Optional[float]:
+        if len(self._samples) < MIN_HEDGE_SAMPLES:
+            return None
+        
+        ordered = sorted(self._samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
 
 
 class RemoteAIService(AIServiceInterface):
     def __init__(
         self,
-        predict_url: Optional[str] = None,
-        health_url: Optional[str] = None,
-        timeout: float = 15.0,
+        predict_urls: Optional[List[str]] = None,
+        timeout: float = AI_SUBMIT_TIMEOUT,
         top_k: int = 5,
+        use_binary: bool = AI_SERVICE_BINARY,
+        use_stream: bool = AI_SERVICE_STREAM,
+        max_retries: int = AI_MAX_RETRIES,
+        pool_size: int = AI_POOL_SIZE,
+        hedge: bool = AI_HEDGE,
+        probe_interval: float = AI_PROBE_INTERVAL,
     ):
-        self.predict_url = predict_url or AI_SERVICE_URL
-        
-        if health_url:
-            self.health_url = health_url
-        else:
-            base_url = self.predict_url.rsplit('/predict', 1)[0]
-            self.health_url = f"{base_url}/health"
+        self.endpoints = [AIEndpoint(url, use_binary, use_stream) for url in predict_urls or AI_SERVICE_URLS]
         
         self.timeout = timeout
         self.top_k = top_k
+        self.max_retries = max_retries
+        self.hedge = hedge and len(self.endpoints) > 1
+        self.probe_interval = probe_interval
+        self.hedged = 0
+        self.breaker = CircuitBreaker(AI_BREAKER_FAILURES, AI_BREAKER_RESET_SECONDS)
+        
+        # One keep-alive pool shared by every green thread instead of a new
+        # connection (and TLS handshake) per frame.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.endpoints), pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        if len(self.endpoints) > 1:
+            threading.Thread(target=self._probe_loop, daemon=True).start()
+    
+    def predict(self, image: np.ndarray, timeout: Optional[float] = None) -> List[Prediction]:
+        check_shape(image)
+        return self._guarded(self._predict, image, timeout or self.timeout)
+    
+    def predict_many(self, images: List[np.ndarray], timeout: Optional[float] = None) -> List[List[Prediction]]:
+        if not images:
+            return []
+        
+        for image in images:
+            check_shape(image)
+        
+        return self._guarded(self._predict_many, images, timeout or self.timeout)
+    
+    def verify(
+        self, image: np.ndarray, target: str, threshold: float, timeout: Optional[float] = None
+    ) -> Verification:
+        check_shape(image)
+        return self._guarded(self._verify, image, target, threshold, timeout or self.timeout)
+    
+    def verify_many(
+        self, images: List[np.ndarray], targets: List[str], threshold: float, timeout: Optional[float] = None
+    ) -> List[Verification]:
+        if not images:
+            return []
+        
+        for image in images:
+            check_shape(image)
+        
+        return self._guarded(self._verify_many, images, targets, threshold, timeout or self.timeout)
+    
+    def _guarded(self, call, *args):
+        if not self.breaker.allow():
+            retry_after = self.breaker.retry_after()
+            raise AIServiceUnavailableError(f"AI service degraded, retrying in {retry_after:.0f}s", retry_after)
+        
+        try:
+            result = self._hedged(call, *args)
+        except Exception:
+            if self.breaker.record_failure():
+                print(f"[AI] Circuit open after {self.breaker.failures} failures, "
+                      f"failing fast for {self.breaker.reset_timeout:.0f}s")
+            raise
+        
+        self.breaker.record_success()
+        return result
+    
+    def _pick(self, exclude: Optional[AIEndpoint] = None) -> Optional[AIEndpoint]:
+        candidates = [endpoint for endpoint in self.endpoints if endpoint is not exclude]
+        available = [endpoint for endpoint in candidates if endpoint.available] or candidates
+        
+        # Power of two choices: compare two random replicas rather than
+        # scanning all of them, which avoids herding onto a single "best" one.
+        if len(available) > 2:
+            available = random.sample(available, 2)
+        
+        return min(available, key=AIEndpoint.cost) if available else None
+    
+    def _hedged(self, call, *args):
+        primary = self._pick()
+        delay = primary.p95() if self.hedge else None
+        if delay is None:
+            return self._send(primary, call, *args)
+        
+        # If the primary has not answered by its own p95, send the same
+        # request to a second replica and take whichever answers first.
+        results = queue.Queue()
+        self._race(results, primary, call, args)
+        pending = 1
+        
+        try:
+            ok, value = results.get(timeout=delay)
+            if ok:
+                return value
+            pending, error = 0, value
+        except queue.Empty:
+            error = None
+        
+        backup = self._pick(exclude=primary)
+        self.hedged += 1
+        self._race(results, backup, call, args)
+        pending += 1
+        
+        for _ in range(pending):
+            ok, value = results.get()
+            if ok:
+                return value
+            error = value
+        
+        raise error
+    
+    def _race(self, results: queue.Queue, endpoint: AIEndpoint, call, args) -> None:
+        def run():
+            try:
+                results.put((True, self._send(endpoint, call, *args)))
+            except Exception as e:
+                results.put((False, e))
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def _send(self, endpoint: AIEndpoint, call, *args):
+        endpoint.outstanding += 1
+        started = time.monotonic()
+        
+        try:
+            result = call(endpoint, *args)
+        except Exception:
+            endpoint.record(time.monotonic() - started, False)
+            raise
+        finally:
+            endpoint.outstanding -= 1
+        
+        endpoint.record(time.monotonic() - started, True)
+        return result
+    
+    def _post(self, url: str, timeout: float, **kwargs) -> requests.Response:
+        # One deadline covers every attempt, so retries never stretch a
+        # draw_update past its budget.
+        deadline = time.monotonic() + timeout
+        
+        for attempt in range(self.max_retries + 1):
+            error = None
+            try:
+                response = self.session.post(url, timeout=max(0.05, deadline - time.monotonic()), **kwargs)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            
+            delay = RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5)
+            if attempt == self.max_retries or time.monotonic() + delay >= deadline:
+                break
+            time.sleep(delay)
+        
+        if error is not None:
+            raise error
+        return response
+    
+    def _predict(self, endpoint: AIEndpoint, image: np.ndarray, timeout: float) -> List[Prediction]:
+        if endpoint.stream is not None and endpoint.stream.enabled:
+            try:
+                return endpoint.stream.predict(image, self.top_k, timeout)
+            except StreamUnavailableError:
+                pass
+        
+        if endpoint.use_binary:
+            return self._predict_binary(endpoint, image, timeout)
+        
+        return self._predict_json(endpoint, image, timeout)
+    
+    def _predict_binary(self, endpoint: AIEndpoint, image: np.ndarray, timeout: float) -> List[Prediction]:
+        try:
+            response = self._post(
+                endpoint.raw_predict_url,
+                timeout,
+                data=encode_image(image),
+                params={"top_k": self.top_k},
+                headers={"Content-Type": "application/octet-stream"},
+            )
+            
+            if response.status_code == 404:
+                print("[AI] /predict_raw not available, falling back to JSON /predict")
+                endpoint.use_binary = False
+                return self._predict_json(endpoint, image, timeout)
+            
+            response.raise_for_status()
+        
+        except RequestException as e:
+            raise RuntimeError(f"AI service failed: {e}") from e
+        
+        try:
+            return decode_compact(response.json())
+        
+        except (json.JSONDecodeError, KeyError) as e:
+            raise RuntimeError(f"Failed to parse: {e}") from e
     
-    def predict(self, image: np.ndarray) -> List[Prediction]:
+    def _predict_many(
+        self, endpoint: AIEndpoint, images: List[np.ndarray], timeout: float
+    ) -> List[List[Prediction]]:
+        if endpoint.stream is not None and endpoint.stream.enabled:
+            try:
+                return endpoint.stream.predict_many(images, self.top_k, timeout)
+            except StreamUnavailableError:
+                pass
         
-        if image.shape != (28, 28):
-            raise ValueError(f"Expected shape (28, 28) and got {image.shape}")
+        if not endpoint.use_binary or not endpoint.use_batch:
+            return [self._predict(endpoint, image, timeout) for image in images]
         
+        try:
+            response = self._post(
+                endpoint.batch_predict_url,
+                timeout,
+                data=b"".join(encode_image(image) for image in images),
+                params={"top_k": self.top_k},
+                headers={"Content-Type": "application/octet-stream"},
+            )
+            
+            if response.status_code == 404:
+                print("[AI] /predict_batch not available, sending frames one by one")
+                endpoint.use_batch = False
+                return [self._predict(endpoint, image, timeout) for image in images]
+            
+            response.raise_for_status()
+        
+        except RequestException as e:
+            raise RuntimeError(f"AI service failed: {e}") from e
+        
+        try:
+            results = response.json()["results"]
+            if len(results) != len(images):
+                raise KeyError(f"expected {len(images)} results, got {len(results)}")
+            
+            return [decode_compact(result) for result in results]
+        
+        except (json.JSONDecodeError, KeyError) as e:
+            raise RuntimeError(f"Failed to parse: {e}") from e
+    
+    def _verify(
+        self, endpoint: AIEndpoint, image: np.ndarray, target: str, threshold: float, timeout: float
+    ) -> Verification:
+        if endpoint.stream is not None and endpoint.stream.enabled:
+            try:
+                return endpoint.stream.verify(image, target, threshold, self.top_k, timeout)
+            except StreamUnavailableError:
+                pass
+        
+        if not endpoint.use_verify:
+            return verify_predictions(self._predict(endpoint, image, timeout), target, threshold)
+        
+        try:
+            response = self._post(
+                endpoint.verify_url,
+                timeout,
+                data=encode_image(image),
+                params={"target": target, "threshold": threshold, "top_k": self.top_k},
+                headers={"Content-Type": "application/octet-stream"},
+            )
+            
+            if response.status_code == 404:
+                print("[AI] /verify not available, checking the target in /predict results")
+                endpoint.use_verify = False
+                return verify_predictions(self._predict(endpoint, image, timeout), target, threshold)
+            
+            response.raise_for_status()
+        
+        except RequestException as e:
+            raise RuntimeError(f"AI service failed: {e}") from e
+        
+        try:
+            return decode_verification(response.json())
+        
+        except (json.JSONDecodeError, KeyError) as e:
+            raise RuntimeError(f"Failed to parse: {e}") from e
+    
+    def _verify_many(
+        self, endpoint: AIEndpoint, images: List[np.ndarray], targets: List[str], threshold: float, timeout: float
+    ) -> List[Verification]:
+        if endpoint.stream is not None and endpoint.stream.enabled:
+            try:
+                return endpoint.stream.verify_many(images, targets, threshold, self.top_k, timeout)
+            except StreamUnavailableError:
+                pass
+        
+        if not endpoint.use_verify:
+            return [
+                verify_predictions(predictions, target, threshold)
+                for predictions, target in zip(self._predict_many(endpoint, images, timeout), targets)
+            ]
+        
+        try:
+            response = self._post(
+                endpoint.verify_batch_url,
+                timeout,
+                data=b"".join(encode_image(image) for image in images),
+                params={"target": list(targets), "threshold": threshold, "top_k": self.top_k},
+                headers={"Content-Type": "application/octet-stream"},
+            )
+            
+            if response.status_code == 404:
+                print("[AI] /verify_batch not available, checking the target in /predict results")
+                endpoint.use_verify = False
+                return self._verify_many(endpoint, images, targets, threshold, timeout)
+            
+            response.raise_for_status()
+        
+        except RequestException as e:
+            raise RuntimeError(f"AI service failed: {e}") from e
+        
+        try:
+            results = response.json()["results"]
+            if len(results) != len(images):
+                raise KeyError(f"expected {len(images)} results, got {len(results)}")
+            
+            return [decode_verification(result) for result in results]
+        
+        except (json.JSONDecodeError, KeyError) as e:
+            raise RuntimeError(f"Failed to parse: {e}") from e
+    
+    def _predict_json(self, endpoint: AIEndpoint, image: np.ndarray, timeout: float) -> List[Prediction]:
         if image.dtype != np.float32:
             image = image.astype(np.float32)
         
@@ -43,10 +636,10 @@ class RemoteAIService(AIServiceInterface):
         }
         
         try:
-            response = requests.post(
-                self.predict_url,
+            response = self._post(
+                endpoint.predict_url,
+                timeout,
                 json=payload,
-                timeout=self.timeout,
                 headers={"Content-Type": "application/json"},
             )
             response.raise_for_status()
@@ -70,17 +663,32 @@ class RemoteAIService(AIServiceInterface):
             raise RuntimeError(f"Failed to parse: {e}") from e
     
     def is_available(self) -> bool:
+        return any([self._probe(endpoint) for endpoint in self.endpoints])
+    
+    def _probe_loop(self) -> None:
+        while True:
+            time.sleep(self.probe_interval)
+            for endpoint in self.endpoints:
+                self._probe(endpoint)
+    
+    def _probe(self, endpoint: AIEndpoint) -> bool:
+        started = time.monotonic()
+        
         try:
-            response = requests.get(
-                self.health_url,
-                timeout=self.timeout,
+            response = self.session.get(
+                endpoint.health_url,
+                timeout=AI_DRAW_TIMEOUT,
             )
             response.raise_for_status()
             
             data = response.json()
-            return data.get("status") == "ok"
+            healthy = data.get("status") == "ok"
             
         except RequestException:
-            return False
+            healthy = False
         except (json.JSONDecodeError, KeyError):
-            return False
+            healthy = False
+        
+        endpoint.healthy = healthy
+        endpoint.record(time.monotonic() - started, healthy, request=False)
+        return healthy
@@ -0,0 +1,24 @@
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def has_token(self) -> bool:
+        self._refill()
+        return self.tokens >= 1.0
+    
+    def take(self) -> bool:
+        if not self.has_token():
+            return False
+        self.tokens -= 1.0
+        return True
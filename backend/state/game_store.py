@@ -72,6 +72,9 @@ class GameStore:
             if lobby.state in (LobbyState.WAITING, LobbyState.GAME_OVER) and not lobby.is_full
         ]
     
+    def get_playing_lobbies(self) -> list[Lobby]:
+        return [lobby for lobby in self.lobbies.values() if lobby.state == LobbyState.IN_GAME]
+    
     def create_game(self) -> Game:
         game = Game()
         self.games[game.id] = game
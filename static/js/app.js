@@ -5,10 +5,12 @@ let currentLobbyId = null;
 let lobbyState = 'waiting';
 let isDrawing = false;
 let lastSendTime = 0;
+let drawInterval = 250;
 let currentRoundNum = 0;
 let maxRounds = 5;
 let timerInterval = null;
 let isEraserMode = false;
+let aiDegraded = false;
 const canvas = document.getElementById('drawingCanvas');
 const ctx = canvas.getContext('2d');
 ctx.fillStyle = '#fff';
@@ -118,7 +120,7 @@ function draw(e) {
 
     lastX = e.offsetX;
     lastY = e.offsetY;
-    if (Date.now() - lastSendTime > 150) {
+    if (Date.now() - lastSendTime > drawInterval) {
         sendDrawing();
         lastSendTime = Date.now();
     }
@@ -343,6 +345,11 @@ function connect() {
         startTimer(data.duration);
         updateButtons();
         SoundFX.roundStart();
+        setDrawCadence(data.draw_updates_per_second);
+    });
+    
+    socket.on('draw_cadence', (data) => {
+        setDrawCadence(data.updates_per_second);
     });
 
     socket.on('ai_prediction', (data) => {
@@ -353,6 +360,19 @@ function connect() {
         }
     });
 
+    socket.on('ai_degraded', (data) => {
+        if (!aiDegraded) {
+            log(`AI service is struggling - ${data.message}`, 'error');
+        }
+        aiDegraded = true;
+        document.getElementById('predictions').innerHTML = `
+            <div class="prediction degraded">
+                <span>AI unavailable</span>
+                <span>retrying in ${Math.ceil(data.retry_after)}s</span>
+            </div>
+        `;
+    });
+    
     socket.on('round_end', (data) => {
         if (data.winner_id) {
             log(`Round ${currentRoundNum} ended! Winner: ${data.winner_username || data.winner_id.slice(0, 8)}`, 'success');
@@ -481,6 +501,12 @@ function copyGameId() {
     }
 }
 
+function setDrawCadence(updatesPerSecond) {
+    if (updatesPerSecond > 0) {
+        drawInterval = 1000 / updatesPerSecond;
+    }
+}
+
 function sendDrawing() {
     if (!socket || !currentLobbyId) return;
     const canvasData = canvas.toDataURL('image/png');
@@ -691,6 +717,10 @@ function updateGameState(game) {
 }
 
 function displayPredictions(predictions, isCorrect) {
+    if (aiDegraded) {
+        log('AI service recovered', 'success');
+        aiDegraded = false;
+    }
     const container = document.getElementById('predictions');
     container.innerHTML = predictions.map((p, i) => `
         <div class="prediction ${i === 0 && isCorrect ? 'match' : ''}">